@@ -1,4 +1,230 @@
+import threading
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from metrics import endpoint_label, registry
+
+# default connection settings for the shared client
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.3
+POOL_SIZE = 10
+
+
+class HttpClient:
+    """
+    Class that holds a pooled, keep-alive requests Session so that successive calls to the same host reuse their TCP/TLS connection.
+    Every call is bounded by a connect and read timeout and idempotent GET requests are retried with exponential backoff on connection errors and 429/5xx responses.
+
+    Parameters
+    ----------
+    connect_timeout : float
+        Seconds to wait for the connection to be established
+    read_timeout : float
+        Seconds to wait for the server to send a response
+    max_retries : int
+        Number of retries before giving up on a request
+    backoff_factor : float
+        Backoff factor between retries (sleeps backoff_factor * 2 ** (retry - 1) seconds)
+    pool_size : int
+        Maximum number of connections kept alive per host
+    """
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, max_retries=MAX_RETRIES,
+                 backoff_factor=BACKOFF_FACTOR, pool_size=POOL_SIZE):
+        self.timeout = (connect_timeout, read_timeout)
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url: str):
+        """
+        Function that will send a GET request through the pooled session using the configured timeouts.
+
+        Parameters
+        ----------
+        url : str
+            URL of the GET API endpoint to be called
+
+        Returns
+        -------
+        requests.Response
+            Response of the API call
+        """
+        return self.session.get(url, timeout=self.timeout)
+
+    def close(self):
+        """
+        Function that will close the session and release its pooled connections.
+        """
+        self.session.close()
+
+
+# shared client used by get_url, created on first use
+_client = None
+
+
+def get_client():
+    """
+    Function that will return the shared HTTP client, creating it with the default settings if needed.
+
+    Returns
+    -------
+    HttpClient
+        Shared client used by get_url
+    """
+    global _client
+    if _client is None:
+        _client = HttpClient()
+    return _client
+
+
+def set_client(client):
+    """
+    Function that will replace the shared HTTP client, for example with a stub in tests.
+    Any object with a get(url) method returning a response-like object can be used.
+
+    Parameters
+    ----------
+    client : object
+        New client to be used by get_url, or None to go back to the default client
+
+    Returns
+    -------
+    object
+        Previous client, so that it can be restored
+    """
+    global _client
+    previous = _client
+    _client = client
+    return previous
+
+
+class SingleFlight:
+    """
+    Class that coalesces concurrent identical calls: while a call for a key is in flight, other callers with the same key wait for it and share its result instead of making their own call.
+    It is thread-safe, so it can be shared by the script threads of all Streamlit sessions.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        """
+        Function that will run fn for a key, or wait for the call already in flight for that key.
+
+        Parameters
+        ----------
+        key : hashable
+            Key identifying identical calls, e.g. the URL
+        fn : function
+            Function without arguments performing the call
+
+        Returns
+        -------
+        object
+            Result of fn (exceptions raised by fn are raised for every waiter)
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"done": threading.Event(), "result": None, "error": None}
+                self.calls[key] = call
+        if leader:
+            try:
+                call["result"] = fn()
+            except BaseException as error:
+                call["error"] = error
+            finally:
+                # later callers start a new call, waiters already holding this one get its result
+                with self.lock:
+                    del self.calls[key]
+                call["done"].set()
+        else:
+            registry.inc("fx_coalesced_requests_total")
+            call["done"].wait()
+        if call["error"] is not None:
+            raise call["error"]
+        return call["result"]
+
+
+# shared single-flight group used by get_url
+_single_flight = SingleFlight()
+
+
+def fetch(url: str):
+    """
+    Function that will call a GET API endpoint url with the shared client and record its latency, status code and retries in the metrics.
+
+    Parameters
+    ----------
+    url : str
+        URL of the GET API endpoint to be called
+
+    Returns
+    -------
+    requests.Response
+        Response of the API call
+    """
+    endpoint = endpoint_label(url)
+    start = time.perf_counter()
+    try:
+        response = get_client().get(url)
+    except requests.RequestException:
+        registry.inc("fx_upstream_responses_total", endpoint=endpoint, status="error")
+        raise
+    finally:
+        registry.observe("fx_upstream_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+    registry.inc("fx_upstream_responses_total", endpoint=endpoint, status=str(response.status_code))
+    # urllib3 keeps the history of the retries made for the response
+    retries = getattr(getattr(response, "raw", None), "retries", None)
+    if retries is not None and retries.history:
+        registry.inc("fx_upstream_retries_total", len(retries.history), endpoint=endpoint)
+    return response
+
+
+class UpstreamError(Exception):
+    """
+    Exception raised when the upstream API could not answer: a connection error, a timeout or a 5xx (or 429) response left after the retries.
+    """
+
+
+def get_response(url: str):
+    """
+    Function that will call a GET API endpoint url, sharing the call with identical requests already in flight, and raise UpstreamError when the API could not answer.
+    Other responses are returned whatever their status code, e.g. a 404 for a date without rates.
+
+    Parameters
+    ----------
+    url : str
+        URL of the GET API endpoint to be called
+
+    Returns
+    -------
+    requests.Response
+        Response of the API call
+    """
+    try:
+        # identical requests already in flight share a single upstream call
+        response = _single_flight.do(url, lambda: fetch(url))
+    except requests.RequestException as error:
+        raise UpstreamError(f"{url}: {error}") from error
+    if response.status_code >= 500 or response.status_code == 429:
+        raise UpstreamError(f"{url}: status {response.status_code}")
+    return response
+
 
 def get_url(url: str):
     """
@@ -16,7 +242,10 @@ def get_url(url: str):
     str
         Text from API call response
     """
-    response = requests.get(url)
+    try:
+        response = get_response(url)
+    except UpstreamError:
+        return "Error: API request failed"
     if response.status_code == 200:
         return response
     else:
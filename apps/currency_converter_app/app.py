@@ -1,11 +1,17 @@
 import streamlit as st
+import pandas as pd
 import datetime
 
-from frankfurter import get_currencies_list, get_latest_rates, get_historical_rate
-from currency import reverse_rate, round_rate, format_output
+from frankfurter import get_currencies_list, get_latest_rates, get_historical_rate, get_rate_matrix, get_time_series
+from currency import reverse_rate, round_rate, format_output, convert_amounts
+from history import DEFAULT_WIDTH, DEFAULT_WINDOW, get_history
+from metrics import serve_metrics_from_env
 
 # main function
 def main():
+    # Serve the metrics if FX_METRICS_PORT is set (only started on the first run)
+    serve_metrics_from_env()
+
     # Display Streamlit App Title
     st.title("FX Converter")
 
@@ -39,14 +45,22 @@ def main():
     )
     # Add a button to get and display the latest rate for selected currencies and amount
     if st.button(label="Get Latest Rate"):
-        ## if the button is clicked, call the get_latest_rates function
-        date_today, rate = get_latest_rates(from_currency, to_currency, amount)
-        ## call format_output to find converted amount and inverse rate, and format the output string
-        fstring = format_output(date_today, from_currency, to_currency, rate, amount)
-        ## display header for Latest Conversion Rate
-        st.header("Latest Conversion Rate")
-        ## display text providing the conversion rate and date
-        st.write(fstring)
+        ## if the button is clicked, load the latest matrix once and call the get_latest_rates function with it
+        matrix = get_rate_matrix()
+        date_today, rate = get_latest_rates(from_currency, to_currency, amount, matrix=matrix)
+        ## the error is displayed without leaving main, so the widgets below are still rendered
+        if rate is None:
+            st.text("Error 2: The latest rate could not be found from the Frankfurter endpoint")
+        else:
+            ## warn the user when the API is unavailable and the last known rates are shown instead
+            if matrix is not None and matrix.stale:
+                st.warning(f"The Frankfurter API is currently unavailable, showing the last known rates from {matrix.date}.")
+            ## call format_output to find converted amount and inverse rate, and format the output string
+            fstring = format_output(date_today, from_currency, to_currency, rate, amount, matrix=matrix)
+            ## display header for Latest Conversion Rate
+            st.header("Latest Conversion Rate")
+            ## display text providing the conversion rate and date
+            st.write(fstring)
 
     # Add a date selector (calendar)
     from_date = st.date_input(
@@ -58,14 +72,74 @@ def main():
 
     # Add a button to get and display the historical rate for selected date, currencies and amount
     if st.button(label="Get Historical Rate"):
-        # if the button is clicked, call the get_historical_rate function
-        rate = get_historical_rate(from_currency, to_currency, from_date, amount)
-        # call format_output to calculate converted amount and inverse rate, and to format the output string
-        fstring = format_output(from_date, from_currency, to_currency, rate, amount)
-        # Display header
-        st.header(f"Conversion Rate for {from_date}")
-        # Display the formatted string
-        st.write(fstring)
+        # if the button is clicked, load the matrix of that date once and call the get_historical_rate function with it
+        matrix = get_rate_matrix(from_date)
+        rate = get_historical_rate(from_currency, to_currency, from_date, amount, matrix=matrix)
+        if rate is None:
+            st.text("Error 3: The historical rate could not be found from the Frankfurter endpoint")
+        else:
+            # call format_output to calculate converted amount and inverse rate, and to format the output string
+            fstring = format_output(from_date, from_currency, to_currency, rate, amount, matrix=matrix)
+            # Display header
+            st.header(f"Conversion Rate for {from_date}")
+            # Display the formatted string
+            st.write(fstring)
+
+    # Add a date range selector for converting the amount over a period of time
+    date_range = st.date_input(
+        label="Select a date range for historical conversions:",
+        value=(datetime.date.today() - datetime.timedelta(days=365), datetime.date.today()),
+        min_value=datetime.date(1999,1,4),
+        max_value=datetime.date.today(),
+    )
+
+    # Add a button to get and chart the rates and converted amounts over the selected date range
+    if st.button(label="Get Rates for Date Range"):
+        # the date input only returns both dates once the end of the range has been picked
+        if len(date_range) != 2:
+            st.text("Please select both a start and an end date")
+        else:
+            start_date, end_date = date_range
+            # fetch every rate of the range with a single call to the Frankfurter range endpoint
+            dates, rates = get_time_series(from_currency, to_currency, start_date, end_date)
+            if dates is None or len(dates) == 0:
+                st.text("Error: No rates could be found from the Frankfurter endpoint for this date range")
+            else:
+                # convert the amount with every rate of the range at once
+                converted_amounts = convert_amounts(amount, rates)
+                series_df = pd.DataFrame({"rate": rates, f"{amount} {from_currency} in {to_currency}": converted_amounts}, index=pd.to_datetime(dates))
+                # Display header
+                st.header(f"Conversion from {start_date} to {end_date}")
+                # Display the chart of converted amounts
+                st.line_chart(series_df.iloc[:, 1])
+                # Display the rates and converted amounts
+                st.dataframe(series_df)
+
+    # Add a long-range history view of the selected pair
+    st.header(f"{from_currency}/{to_currency} History")
+    history_range = st.date_input(
+        label="Select a date range for the history chart:",
+        value=(datetime.date(1999,1,4), datetime.date.today()),
+        min_value=datetime.date(1999,1,4),
+        max_value=datetime.date.today(),
+    )
+    ## number of points drawn, matched to the width of the chart
+    n_points = st.slider(label="Number of points on the chart:", min_value=100, max_value=2000, value=DEFAULT_WIDTH, step=100)
+    method = st.radio(label="Downsampling method:", options=["lttb", "minmax"], horizontal=True)
+    window = st.number_input(label="Rolling window (trading days):", min_value=2, max_value=250, value=DEFAULT_WINDOW)
+
+    if st.button(label="Show History"):
+        if len(history_range) != 2:
+            st.text("Please select both a start and an end date")
+        else:
+            # fetch the range once, then downsample it on the server before charting
+            history_df = get_history(from_currency, to_currency, history_range[0], history_range[1], n_points, method, window)
+            if history_df is None:
+                st.text("Error: No rates could be found from the Frankfurter endpoint for this date range")
+            else:
+                st.line_chart(history_df[["rate", "rolling_mean"]])
+                st.write("Annualized rolling volatility")
+                st.line_chart(history_df["volatility"])
 
 # call main
 main()
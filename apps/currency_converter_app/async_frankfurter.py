@@ -0,0 +1,274 @@
+import asyncio
+import time
+
+import aiohttp
+
+import frankfurter
+from api import CONNECT_TIMEOUT, READ_TIMEOUT, UpstreamError
+from cache import is_past_date, to_iso_date
+from ecb_calendar import published_date
+from frankfurter import MATRIX_BASE, RateMatrix, store_rate_matrix, stored_rate_matrix, upstream_breaker
+from metrics import endpoint_label, registry
+
+# maximum number of requests in flight at the same time
+MAX_CONCURRENCY = 8
+
+
+class AsyncFrankfurterClient:
+    """
+    Class that calls the Frankfurter API with asyncio so that several lookups run concurrently instead of back to back.
+    The number of requests in flight is bounded by a semaphore and all requests share one aiohttp session.
+    Lookups share the circuit breaker, the historical rate store and the offline backend of frankfurter.py; the blocking SQLite and offline store calls
+    run in worker threads so that they do not stall the event loop. The latest rates go through frankfurter.get_rate_matrix() in a worker thread,
+    so they share the LatestRatesCache of the app (and are fetched from frankfurter.BASE_URL).
+    It must be used as an async context manager:
+
+        async with AsyncFrankfurterClient() as client:
+            rates = await client.get_historical_rates([("USD", "GBP", "2020-01-02"), ("EUR", "JPY", "2021-06-01")])
+
+    Parameters
+    ----------
+    max_concurrency : int
+        Maximum number of requests in flight at the same time
+    base_url : str
+        URL of the Frankfurter API (defaults to frankfurter.BASE_URL, e.g. a local stand-in server in tests)
+    """
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, base_url=None):
+        self.base_url = frankfurter.BASE_URL if base_url is None else base_url
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.timeout = aiohttp.ClientTimeout(sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT)
+        self.session = None
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    async def get_json(self, path):
+        """
+        Function that will call a Frankfurter endpoint and return its JSON content, recording its latency and status code in the same metrics as api.fetch.
+
+        Parameters
+        ----------
+        path : str
+            Path and query string of the endpoint, e.g. /latest?from=EUR
+
+        Returns
+        -------
+        dict
+            JSON content of the response or None if the API answered with another error status (e.g. 404 for a date without rates)
+
+        Raises
+        ------
+        UpstreamError
+            If the API could not answer (connection error, timeout, 5xx or 429 response), so that the circuit breaker counts it as a failure
+        """
+        url = f'{self.base_url}{path}'
+        endpoint = endpoint_label(url)
+        async with self.semaphore:
+            # the latency is measured once a slot is free, like the calls of the shared client, and includes reading the body
+            start = time.perf_counter()
+            try:
+                async with self.session.get(url) as response:
+                    status = response.status
+                    json = await response.json() if status == 200 else None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                registry.inc("fx_upstream_responses_total", endpoint=endpoint, status="error")
+                raise UpstreamError(f"{path}: {error!r}") from error
+            finally:
+                registry.observe("fx_upstream_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+        registry.inc("fx_upstream_responses_total", endpoint=endpoint, status=str(status))
+        if status >= 500 or status == 429:
+            raise UpstreamError(f"{path}: status {status}")
+        return json
+
+    async def get_currencies_list(self):
+        """
+        Function that will get the list of available currencies.
+
+        Returns
+        -------
+        list
+            List of available currencies or None in case of error
+        """
+        if frankfurter.BACKEND == "offline":
+            return await asyncio.to_thread(frankfurter.get_currencies_list)
+
+        async def fetch():
+            json = await self.get_json('/currencies')
+            return None if json is None else list(json.keys())
+
+        # same breaker key as frankfurter.get_currencies_list, so both share the last known list
+        return await upstream_breaker.call_async('currencies', fetch)
+
+    async def get_rate_matrix(self, date=None):
+        """
+        Function that will get the RateMatrix for a date, reading past dates from the local historical rate store when possible.
+
+        Parameters
+        ----------
+        date : datetime.date or str
+            Date of the rates (defaults to None for the latest rates)
+
+        Returns
+        -------
+        RateMatrix
+            Matrix of all cross rates or None in case of error
+        """
+        if date is None or frankfurter.BACKEND == "offline":
+            # the latest rates cache and the offline store are synchronous
+            return await asyncio.to_thread(frankfurter.get_rate_matrix, date)
+        # weekends and holidays share the cache entry of the previous business day
+        iso_date = to_iso_date(published_date(date))
+        past = is_past_date(iso_date)
+        if past:
+            matrix = await asyncio.to_thread(stored_rate_matrix, iso_date)
+            if matrix is not None:
+                return matrix
+
+        async def fetch():
+            json = await self.get_json(f'/{iso_date}?from={MATRIX_BASE}')
+            return None if json is None else RateMatrix(json['date'], json['base'], json['rates'])
+
+        # past matrices are kept in the historical rate store, so the breaker does not remember them (like frankfurter.fetch_rate_matrix)
+        matrix = await upstream_breaker.call_async(iso_date, fetch, remember=False)
+        if past:
+            await asyncio.to_thread(store_rate_matrix, iso_date, matrix)
+        return matrix
+
+    async def get_latest_rates(self, from_currency, to_currency, amount=None):
+        """
+        Function that will get the latest conversion rate between the provided currencies.
+
+        Parameters
+        ----------
+        from_currency : str
+            Code for the origin currency
+        to_currency : str
+            Code for the destination currency
+        amount : float
+            The amount (in origin currency) to be converted (unused, kept for parity with frankfurter.get_latest_rates)
+
+        Returns
+        -------
+        str
+            Date of latest FX conversion rate or None in case of error
+        float
+            Latest FX conversion rate or None in case of error
+        """
+        matrix = await self.get_rate_matrix()
+        if matrix is None or matrix.rate(from_currency, to_currency) is None:
+            return None, None
+        return matrix.date, matrix.rate(from_currency, to_currency)
+
+    async def get_historical_rate(self, from_currency, to_currency, from_date, amount=None):
+        """
+        Function that will get the conversion rate between the provided currencies for a date.
+
+        Parameters
+        ----------
+        from_currency : str
+            Code for the origin currency
+        to_currency : str
+            Code for the destination currency
+        from_date : datetime.date or str
+            Date when the conversion rate was recorded
+        amount : float
+            The amount (in origin currency) to be converted (unused, kept for parity with frankfurter.get_historical_rate)
+
+        Returns
+        -------
+        float
+            FX conversion rate or None in case of error
+        """
+        matrix = await self.get_rate_matrix(from_date)
+        return None if matrix is None else matrix.rate(from_currency, to_currency)
+
+    async def get_historical_rates(self, lookups):
+        """
+        Function that will get the conversion rates of many (from_currency, to_currency, date) lookups concurrently.
+        Each distinct business day is only fetched once, whatever the number of pairs asked for that date.
+
+        Parameters
+        ----------
+        lookups : list
+            List of (from_currency, to_currency, date) tuples
+
+        Returns
+        -------
+        list
+            FX conversion rates in the same order as lookups (None in case of error)
+        """
+        dates = sorted({published_date(date) for _, _, date in lookups})
+        matrices = dict(zip(dates, await asyncio.gather(*(self.get_rate_matrix(date) for date in dates))))
+        rates = []
+        for from_currency, to_currency, date in lookups:
+            matrix = matrices[published_date(date)]
+            rates.append(None if matrix is None else matrix.rate(from_currency, to_currency))
+        return rates
+
+
+def get_historical_rates(lookups, max_concurrency=MAX_CONCURRENCY):
+    """
+    Function that will get the conversion rates of many (from_currency, to_currency, date) lookups concurrently from synchronous code such as the Streamlit app.
+    It must not be called from a thread that already runs an asyncio event loop.
+
+    Parameters
+    ----------
+    lookups : list
+        List of (from_currency, to_currency, date) tuples
+    max_concurrency : int
+        Maximum number of requests in flight at the same time
+
+    Returns
+    -------
+    list
+        FX conversion rates in the same order as lookups (None in case of error)
+    """
+    async def run():
+        async with AsyncFrankfurterClient(max_concurrency) as client:
+            return await client.get_historical_rates(lookups)
+    return asyncio.run(run())
+
+
+def get_latest_rates(pairs, max_concurrency=MAX_CONCURRENCY):
+    """
+    Function that will get the latest conversion rates of many (from_currency, to_currency) pairs from synchronous code such as the Streamlit app.
+    All pairs are derived from a single latest RateMatrix.
+
+    Parameters
+    ----------
+    pairs : list
+        List of (from_currency, to_currency) tuples
+    max_concurrency : int
+        Maximum number of requests in flight at the same time
+
+    Returns
+    -------
+    list
+        (date, rate) tuples in the same order as pairs ((None, None) in case of error)
+    """
+    async def run():
+        async with AsyncFrankfurterClient(max_concurrency) as client:
+            matrix = await client.get_rate_matrix()
+            if matrix is None:
+                return [(None, None)] * len(pairs)
+            return [(matrix.date, matrix.rate(from_currency, to_currency)) for from_currency, to_currency in pairs]
+    return asyncio.run(run())
+
+
+def get_currencies_list():
+    """
+    Function that will get the list of available currencies from synchronous code.
+
+    Returns
+    -------
+    list
+        List of available currencies or None in case of error
+    """
+    async def run():
+        async with AsyncFrankfurterClient() as client:
+            return await client.get_currencies_list()
+    return asyncio.run(run())
@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+
+from ecb_calendar import published_date
+from frankfurter import get_rate_matrix
+
+# number of rows read and converted at a time
+CHUNK_SIZE = 100_000
+# default column names of the input transactions
+COLUMNS = {"amount": "amount", "from_currency": "from_currency", "to_currency": "to_currency", "date": "date"}
+
+
+def iter_chunks(source, chunksize=CHUNK_SIZE):
+    """
+    Function that will split the input transactions into DataFrame chunks of at most chunksize rows.
+
+    Parameters
+    ----------
+    source : pd.DataFrame, str or file-like
+        Transactions as a DataFrame, or path / file object of a CSV file
+    chunksize : int
+        Maximum number of rows per chunk
+
+    Returns
+    -------
+    generator
+        DataFrame chunks of the input
+    """
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize]
+    else:
+        yield from pd.read_csv(source, chunksize=chunksize)
+
+
+def parse_dates(values):
+    """
+    Function that will parse dates written in any format, returning NaT for the values that are not valid dates instead of raising.
+
+    Parameters
+    ----------
+    values : array-like
+        Dates as strings, datetime.date or timestamps
+
+    Returns
+    -------
+    pd.DatetimeIndex
+        Parsed dates (NaT for missing and invalid values)
+    """
+    # each value is parsed on its own like pd.Timestamp would, so files mixing date formats are still read
+    return pd.DatetimeIndex(pd.to_datetime(values, errors="coerce", format="mixed"))
+
+
+def invalid_dates(chunk, columns=COLUMNS):
+    """
+    Function that will find the transactions whose date is filled in but is not a valid date (e.g. "2020-02-30" or "n/a").
+
+    Parameters
+    ----------
+    chunk : pd.DataFrame
+        Transactions with a date column
+    columns : dict
+        Names of the amount, from_currency, to_currency and date columns in the input
+
+    Returns
+    -------
+    np.ndarray
+        Boolean mask of the rows with an invalid date
+    """
+    # only the unique values are parsed
+    date_codes, unique_dates = pd.factorize(chunk[columns["date"]])
+    invalid = np.append(parse_dates(unique_dates).isna(), False)
+    return invalid[date_codes]
+
+
+def convert_chunk(chunk, quotes_cache, columns=COLUMNS):
+    """
+    Function that will convert one chunk of transactions with vectorized NumPy operations.
+    The chunk is collapsed to its unique dates and each date's RateMatrix is fetched only once (and only once across chunks thanks to quotes_cache).
+    The quotes of every currency against the matrix base are stacked in a (dates x currencies) table, so the rate of each row is quote[date, to] / quote[date, from].
+
+    Parameters
+    ----------
+    chunk : pd.DataFrame
+        Transactions with amount, origin currency, destination currency and date columns
+    quotes_cache : dict
+        Mapping of ISO business days to their RateMatrix, shared between chunks
+    columns : dict
+        Names of the amount, from_currency, to_currency and date columns in the input
+
+    Returns
+    -------
+    pd.DataFrame
+        Copy of the chunk with rate, inverse_rate and converted_amount columns (NaN where no rate could be found or the date is invalid, see invalid_dates)
+    """
+    date_codes, unique_dates = pd.factorize(chunk[columns["date"]])
+    # invalid dates are coerced to NaT and handled like missing ones
+    parsed_dates = parse_dates(unique_dates)
+    date_codes = np.where(np.append(parsed_dates.isna(), False)[date_codes], -1, date_codes)
+    from_codes, from_uniques = pd.factorize(chunk[columns["from_currency"]])
+    to_codes, to_uniques = pd.factorize(chunk[columns["to_currency"]])
+    currencies = list(from_uniques) + list(to_uniques)
+
+    # one row of quotes per unique date, one column per currency seen in the chunk
+    quotes = np.full((len(unique_dates), len(currencies)), np.nan)
+    for i, date in enumerate(parsed_dates):
+        if pd.isna(date):
+            continue
+        # key by the business day whose rates apply, so weekend and holiday rows share one entry
+        iso_date = published_date(date.date())
+        if iso_date not in quotes_cache:
+            quotes_cache[iso_date] = get_rate_matrix(iso_date)
+        matrix = quotes_cache[iso_date]
+        if matrix is not None:
+            quotes[i] = matrix.quotes(currencies)
+
+    # missing values are factorized as -1, use them to mask the results
+    valid = (date_codes >= 0) & (from_codes >= 0) & (to_codes >= 0)
+    rate = np.full(len(chunk), np.nan)
+    rows = date_codes[valid]
+    rate[valid] = quotes[rows, len(from_uniques) + to_codes[valid]] / quotes[rows, from_codes[valid]]
+    amount = pd.to_numeric(chunk[columns["amount"]], errors="coerce").to_numpy(dtype=np.float64)
+
+    result = chunk.copy()
+    result["rate"] = rate
+    with np.errstate(divide="ignore"):
+        result["inverse_rate"] = np.where(rate != 0, 1 / rate, 0)
+    result["converted_amount"] = np.round(amount * rate, 2)
+    return result
+
+
+def convert_batch(source, chunksize=CHUNK_SIZE, columns=COLUMNS):
+    """
+    Function that will convert a file of transactions chunk by chunk, so that memory stays bounded whatever the size of the input.
+
+    Parameters
+    ----------
+    source : pd.DataFrame, str or file-like
+        Transactions as a DataFrame, or path / file object of a CSV file
+    chunksize : int
+        Maximum number of rows per chunk
+    columns : dict
+        Names of the amount, from_currency, to_currency and date columns in the input
+
+    Returns
+    -------
+    generator
+        Converted DataFrame chunks (see convert_chunk)
+    """
+    quotes_cache = {}
+    for chunk in iter_chunks(source, chunksize):
+        yield convert_chunk(chunk, quotes_cache, columns)
+
+
+def convert_file(source, destination, chunksize=CHUNK_SIZE, columns=COLUMNS):
+    """
+    Function that will convert a file of transactions and stream the results to a CSV file.
+
+    Parameters
+    ----------
+    source : pd.DataFrame, str or file-like
+        Transactions as a DataFrame, or path / file object of a CSV file
+    destination : str or file-like
+        Path or file object of the output CSV file
+    chunksize : int
+        Maximum number of rows per chunk
+    columns : dict
+        Names of the amount, from_currency, to_currency and date columns in the input
+
+    Returns
+    -------
+    int
+        Number of rows written
+    """
+    n_rows = 0
+    for i, converted in enumerate(convert_batch(source, chunksize, columns)):
+        converted.to_csv(destination, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        n_rows += len(converted)
+    return n_rows
@@ -0,0 +1,183 @@
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# Set Python path to the app folder
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fake_frankfurter import FakeFrankfurter
+
+
+def summarize(name, latencies, elapsed, n_errors):
+    """
+    Function that will summarize the latencies of a scenario.
+
+    Parameters
+    ----------
+    name : str
+        Name of the scenario
+    latencies : list
+        Latency of each call in seconds
+    elapsed : float
+        Wall clock duration of the scenario in seconds
+    n_errors : int
+        Number of calls that returned no result
+
+    Returns
+    -------
+    dict
+        Number of calls, errors, p50/p95/p99 latencies in milliseconds and throughput in calls per second
+    """
+    latencies_ms = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "scenario": name,
+        "n_calls": len(latencies),
+        "n_errors": n_errors,
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "throughput_per_s": round(len(latencies) / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def run_scenario(name, call, n_calls, before_each=None, workers=1, setup=None):
+    """
+    Function that will time n_calls calls of a function, sequentially or from a pool of threads.
+
+    Parameters
+    ----------
+    name : str
+        Name of the scenario
+    call : function
+        Function taking the index of the call and returning a result (None counts as an error)
+    n_calls : int
+        Number of calls
+    before_each : function
+        Function run before each sequential call and outside of the timing, e.g. to empty the caches (optional)
+    workers : int
+        Number of threads making the calls concurrently
+    setup : function
+        Function run once before the scenario and outside of the timing, e.g. to warm the caches (optional)
+
+    Returns
+    -------
+    dict
+        Summary of the scenario (see summarize)
+    """
+    if setup is not None:
+        setup()
+    def timed(i):
+        start = time.perf_counter()
+        result = call(i)
+        return time.perf_counter() - start, result is None or result == (None, None)
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = []
+        for i in range(n_calls):
+            if before_each is not None:
+                before_each()
+            results.append(timed(i))
+    else:
+        with ThreadPoolExecutor(workers) as pool:
+            results = list(pool.map(timed, range(n_calls)))
+    elapsed = time.perf_counter() - start
+    return summarize(name, [latency for latency, _ in results], elapsed, sum(error for _, error in results))
+
+
+def run_benchmarks(n_calls=50, latency=0.02, error_rate=0.0, workers=8):
+    """
+    Function that will start a fake Frankfurter server and benchmark the rate lookups of the app in cold-cache, warm-cache and concurrent scenarios.
+
+    Parameters
+    ----------
+    n_calls : int
+        Number of calls per scenario
+    latency : float
+        Seconds of latency injected by the fake server per request
+    error_rate : float
+        Probability of the fake server answering with a 500 error
+    workers : int
+        Number of threads in the concurrent scenarios
+
+    Returns
+    -------
+    dict
+        Settings of the run and the summary of each scenario
+    """
+    with FakeFrankfurter(latency, error_rate) as server:
+        # the app modules read the API URL when they are imported
+        os.environ["FRANKFURTER_URL"] = server.url
+        import frankfurter
+        from cache import HistoricalRateStore, latest_rates_cache, set_historical_store
+        from currency import format_output
+        frankfurter.BASE_URL = server.url
+
+        def clear_caches():
+            latest_rates_cache.clear()
+            frankfurter._past_rate_matrix.cache_clear()
+            set_historical_store(HistoricalRateStore(":memory:"))
+
+        def reset_breaker():
+            # failures and last good values of a scenario must not open the circuit or serve stale values in the next one
+            frankfurter.upstream_breaker.reset()
+
+        # every cold historical call asks for a different business day
+        start_date = datetime.date(2000, 1, 3)
+        cold_dates = [(start_date + datetime.timedelta(weeks=i)).isoformat() for i in range(n_calls)]
+
+        def warm_historical():
+            # the cold scenario has evicted the date queried by the warm one, so it is loaded again before the timing starts
+            reset_breaker()
+            frankfurter.get_historical_rate("USD", "GBP", cold_dates[0], 1)
+
+        clear_caches()
+        scenarios = [
+            run_scenario("currencies_list", lambda i: frankfurter.get_currencies_list(), n_calls, setup=reset_breaker),
+            run_scenario("latest_cold", lambda i: frankfurter.get_latest_rates("USD", "GBP", 1), n_calls, before_each=clear_caches, setup=reset_breaker),
+            run_scenario("latest_warm", lambda i: frankfurter.get_latest_rates("USD", "GBP", 1), n_calls, setup=reset_breaker),
+            run_scenario("historical_cold", lambda i: frankfurter.get_historical_rate("USD", "GBP", cold_dates[i], 1), n_calls, before_each=clear_caches, setup=reset_breaker),
+            run_scenario("historical_warm", lambda i: frankfurter.get_historical_rate("USD", "GBP", cold_dates[0], 1), n_calls, setup=warm_historical),
+        ]
+        matrix = frankfurter.get_rate_matrix()
+        scenarios.append(run_scenario("format_output", lambda i: format_output(matrix.date, "USD", "GBP", matrix.rate("USD", "GBP"), 50.0, matrix=matrix), n_calls))
+
+        clear_caches()
+        n_requests = server.n_requests
+        scenarios.append(run_scenario("latest_concurrent_cold", lambda i: frankfurter.get_latest_rates("USD", "GBP", 1), n_calls, workers=workers, setup=reset_breaker))
+        scenarios[-1]["upstream_requests"] = server.n_requests - n_requests
+
+        clear_caches()
+        n_requests = server.n_requests
+        scenarios.append(run_scenario("historical_concurrent_cold", lambda i: frankfurter.get_historical_rate("USD", "GBP", cold_dates[i], 1), n_calls, workers=workers, setup=reset_breaker))
+        scenarios[-1]["upstream_requests"] = server.n_requests - n_requests
+
+    return {
+        "settings": {"n_calls": n_calls, "latency_s": latency, "error_rate": error_rate, "workers": workers},
+        "scenarios": scenarios,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the currency converter against a local fake Frankfurter server")
+    parser.add_argument("--calls", type=int, default=50, help="number of calls per scenario")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds of latency injected per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a 500 error per request")
+    parser.add_argument("--workers", type=int, default=8, help="number of threads in the concurrent scenarios")
+    parser.add_argument("--output", help="path of the JSON report (defaults to stdout)")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.calls, args.latency, args.error_rate, args.workers)
+    if args.output:
+        with open(args.output, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
@@ -0,0 +1,150 @@
+import datetime
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# currencies served by the stand-in server, quoted against EUR
+CURRENCIES = ["AUD", "BGN", "BRL", "CAD", "CHF", "CNY", "CZK", "DKK", "EUR", "GBP", "HKD", "HUF", "IDR", "ILS", "INR",
+              "ISK", "JPY", "KRW", "MXN", "MYR", "NOK", "NZD", "PHP", "PLN", "RON", "SEK", "SGD", "THB", "TRY", "USD", "ZAR"]
+DATE_PATTERN = re.compile(r"^/(\d{4}-\d{2}-\d{2})$")
+RANGE_PATTERN = re.compile(r"^/(\d{4}-\d{2}-\d{2})\.\.(\d{4}-\d{2}-\d{2})?$")
+
+
+def business_day(date):
+    """
+    Function that will move a date back to the previous weekday, like Frankfurter does for weekends.
+    """
+    while date.weekday() > 4:
+        date -= datetime.timedelta(days=1)
+    return date
+
+
+def eur_quotes(date):
+    """
+    Function that will generate deterministic quotes against EUR for a date.
+    """
+    rng = random.Random(date.toordinal())
+    return {currency: round(rng.uniform(0.5, 150), 4) for currency in CURRENCIES if currency != "EUR"}
+
+
+def convert(quotes, base, symbols):
+    """
+    Function that will rebase EUR quotes to another currency and keep only the requested symbols.
+    """
+    base_quote = 1.0 if base == "EUR" else quotes[base]
+    all_quotes = dict(quotes, EUR=1.0)
+    return {currency: round(quote / base_quote, 5) for currency, quote in all_quotes.items() if currency != base and (not symbols or currency in symbols)}
+
+
+class FakeFrankfurterHandler(BaseHTTPRequestHandler):
+    """
+    Class that answers the Frankfurter endpoints used by the app (/currencies, /latest, /{date} and /{start}..{end}) with generated rates.
+    The latency and error rate of the server are read from the server object.
+    """
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.n_requests += 1
+        time.sleep(server.latency)
+        if server.rng.random() < server.error_rate:
+            self.send_json(500, {"message": "injected error"})
+            return
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        base = query.get("from", ["EUR"])[0]
+        symbols = set(query.get("to", [""])[0].split(",")) - {""}
+
+        if url.path == "/currencies":
+            self.send_json(200, {currency: currency for currency in CURRENCIES})
+            return
+        if url.path == "/latest":
+            date = business_day(datetime.date.today())
+            self.send_json(200, {"amount": 1.0, "base": base, "date": date.isoformat(), "rates": convert(eur_quotes(date), base, symbols)})
+            return
+        match = DATE_PATTERN.match(url.path)
+        if match:
+            date = business_day(datetime.date.fromisoformat(match.group(1)))
+            self.send_json(200, {"amount": 1.0, "base": base, "date": date.isoformat(), "rates": convert(eur_quotes(date), base, symbols)})
+            return
+        match = RANGE_PATTERN.match(url.path)
+        if match:
+            start = datetime.date.fromisoformat(match.group(1))
+            end = datetime.date.fromisoformat(match.group(2)) if match.group(2) else datetime.date.today()
+            rates = {}
+            date = start
+            while date <= end:
+                if date.weekday() < 5:
+                    rates[date.isoformat()] = convert(eur_quotes(date), base, symbols)
+                date += datetime.timedelta(days=1)
+            self.send_json(200, {"amount": 1.0, "base": base, "start_date": start.isoformat(), "end_date": end.isoformat(), "rates": rates})
+            return
+        self.send_json(404, {"message": "not found"})
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeFrankfurter(ThreadingHTTPServer):
+    """
+    Class that runs a local stand-in Frankfurter server in a background thread.
+
+    Parameters
+    ----------
+    latency : float
+        Seconds of latency injected before each response
+    error_rate : float
+        Probability of answering a request with a 500 error
+    seed : int
+        Seed of the error injection
+    """
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=0):
+        super().__init__(("127.0.0.1", 0), FakeFrankfurterHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.n_requests = 0
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local stand-in Frankfurter server")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds of latency injected per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a 500 error per request")
+    args = parser.parse_args()
+    with FakeFrankfurter(args.latency, args.error_rate) as server:
+        print(f"Serving a fake Frankfurter API on {server.url} (Ctrl+C to stop)")
+        try:
+            server.thread.join()
+        except KeyboardInterrupt:
+            pass
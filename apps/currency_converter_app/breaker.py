@@ -0,0 +1,236 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from metrics import registry
+
+# default settings of the circuit breaker
+FAILURE_THRESHOLD = 3
+SLOW_THRESHOLD = 2.0
+LATENCY_BUDGET = 3.0
+RESET_TIMEOUT = 30.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Class that protects the app from a slow or failing upstream API.
+    Calls run in a worker thread and the caller never waits longer than latency_budget: past that, the last known good value (or the fallback) is returned instead.
+    After failure_threshold consecutive failures or slow calls (slower than slow_threshold), the circuit opens and callers get the fallback straight away.
+    Once reset_timeout has passed, a single probe call is made in the background and the circuit closes again if it succeeds.
+    A call fails if it raises an exception (fn should raise for transport errors, 5xx responses and timeouts) or is slow; a call returning None
+    means the upstream API answered without a value (e.g. a 404 for a date without rates), so it is passed to the caller and does not count as a failure.
+    Each call is counted once, including a call that exceeded the latency budget and finishes in the background.
+
+    Parameters
+    ----------
+    failure_threshold : int
+        Number of consecutive failures or slow calls that opens the circuit
+    slow_threshold : float
+        Seconds after which a successful call still counts as a failure
+    latency_budget : float
+        Maximum number of seconds a caller waits for a call
+    reset_timeout : float
+        Seconds the circuit stays open before probing the upstream API
+    """
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, slow_threshold=SLOW_THRESHOLD,
+                 latency_budget=LATENCY_BUDGET, reset_timeout=RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.slow_threshold = slow_threshold
+        self.latency_budget = latency_budget
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="breaker")
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_good = {}
+        self.tasks = set()
+
+    def call(self, key, fn, fallback=None, remember=True):
+        """
+        Function that will run fn through the circuit breaker.
+
+        Parameters
+        ----------
+        key : hashable
+            Key under which the last good value of fn is remembered
+        fn : function
+            Function without arguments calling the upstream API
+        fallback : function
+            Function without arguments returning a fallback value when there is no last good value for key (optional)
+        remember : bool
+            Whether to keep the last good value of fn for key (turn off for values that are already stored elsewhere)
+
+        Returns
+        -------
+        object
+            Result of fn, or the last good / fallback value (wrapped with stale_value) when the call failed, was too slow or the circuit is open
+        """
+        state, probe = self._check_state()
+        # outcome of this call, recorded by whichever of the caller or the worker sees it first
+        attempt = {"recorded": False}
+        if state == OPEN or state == HALF_OPEN:
+            if probe:
+                # probe in the background, the caller does not wait for it
+                self.executor.submit(self._run, key, fn, remember, attempt)
+            return self._fallback(key, fallback)
+
+        future = self.executor.submit(self._run, key, fn, remember, attempt)
+        try:
+            return future.result(timeout=self.latency_budget)
+        except TimeoutError:
+            # the call keeps running in the background and will still update the last good value, but it is only counted as a failure here
+            self._record(False, attempt)
+            return self._fallback(key, fallback)
+        except Exception:
+            return self._fallback(key, fallback)
+
+    async def call_async(self, key, fn, fallback=None, remember=True):
+        """
+        Function that will run a coroutine function through the circuit breaker, sharing its state and last good values with call().
+        The call runs as a task of the event loop and the caller never awaits it longer than latency_budget.
+
+        Parameters
+        ----------
+        key : hashable
+            Key under which the last good value of fn is remembered
+        fn : function
+            Coroutine function without arguments calling the upstream API
+        fallback : function
+            Function without arguments returning a fallback value when there is no last good value for key (optional)
+        remember : bool
+            Whether to keep the last good value of fn for key (turn off for values that are already stored elsewhere)
+
+        Returns
+        -------
+        object
+            Result of fn, or the last good / fallback value (wrapped with stale_value) when the call failed, was too slow or the circuit is open
+        """
+        state, probe = self._check_state()
+        attempt = {"recorded": False}
+        if state == OPEN or state == HALF_OPEN:
+            if probe:
+                self._keep_task(asyncio.ensure_future(self._run_async(key, fn, remember, attempt)))
+            return self._fallback(key, fallback)
+
+        task = self._keep_task(asyncio.ensure_future(self._run_async(key, fn, remember, attempt)))
+        try:
+            # shielded so that the call goes on in the background after a timeout, like in call()
+            return await asyncio.wait_for(asyncio.shield(task), self.latency_budget)
+        except asyncio.TimeoutError:
+            self._record(False, attempt)
+            return self._fallback(key, fallback)
+        except Exception:
+            return self._fallback(key, fallback)
+
+    def reset(self):
+        """
+        Function that will close the circuit and forget the failures and last good values, e.g. between benchmark scenarios.
+        """
+        with self.lock:
+            self.failures = 0
+            self.opened_at = 0.0
+            self.last_good.clear()
+            if self.state != CLOSED:
+                self._set_state(CLOSED)
+
+    def _check_state(self):
+        # returns the state seen by a new call and whether it must probe the upstream API
+        with self.lock:
+            state = self.state
+            probe = state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout
+            if probe:
+                self._set_state(HALF_OPEN)
+        return state, probe
+
+    def _run(self, key, fn, remember, attempt):
+        start = time.monotonic()
+        try:
+            result = fn()
+        except Exception:
+            self._record(False, attempt)
+            raise
+        return self._finish(key, result, time.monotonic() - start, remember, attempt)
+
+    async def _run_async(self, key, fn, remember, attempt):
+        start = time.monotonic()
+        try:
+            result = await fn()
+        except Exception:
+            self._record(False, attempt)
+            raise
+        return self._finish(key, result, time.monotonic() - start, remember, attempt)
+
+    def _finish(self, key, result, elapsed, remember, attempt):
+        if result is not None and remember:
+            with self.lock:
+                self.last_good[key] = result
+        self._record(elapsed <= self.slow_threshold, attempt)
+        return result
+
+    def _keep_task(self, task):
+        # the event loop only keeps weak references to tasks, so background calls are held until they finish
+        with self.lock:
+            self.tasks.add(task)
+        task.add_done_callback(self._forget_task)
+        return task
+
+    def _forget_task(self, task):
+        with self.lock:
+            self.tasks.discard(task)
+        # the error of a background call has already been recorded
+        if not task.cancelled():
+            task.exception()
+
+    def _record(self, success, attempt):
+        with self.lock:
+            if attempt["recorded"]:
+                return
+            attempt["recorded"] = True
+            if success:
+                self.failures = 0
+                if self.state != CLOSED:
+                    self._set_state(CLOSED)
+            else:
+                self.failures += 1
+                if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                    self.opened_at = time.monotonic()
+                    self._set_state(OPEN)
+
+    def _set_state(self, state):
+        # must be called with the lock held
+        self.state = state
+        registry.inc("fx_breaker_transitions_total", state=state)
+
+    def _fallback(self, key, fallback):
+        with self.lock:
+            value = self.last_good.get(key)
+        if value is None and fallback is not None:
+            value = fallback()
+        if value is None:
+            return None
+        registry.inc("fx_breaker_fallbacks_total")
+        return stale_value(value)
+
+
+def stale_value(value):
+    """
+    Function that will mark a value as stale, using its as_stale() method when it has one.
+
+    Parameters
+    ----------
+    value : object
+        Value served from the last known good results
+
+    Returns
+    -------
+    object
+        Stale copy of the value (or the value itself if it cannot be marked)
+    """
+    as_stale = getattr(value, "as_stale", None)
+    return as_stale() if as_stale is not None else value
@@ -0,0 +1,401 @@
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from zoneinfo import ZoneInfo
+
+from metrics import registry
+
+# location of the on-disk store, can be overridden with the FX_CACHE_PATH environment variable
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fx_cache.sqlite3")
+
+# the ECB publishes its reference rates around 16:00 CET on business days, Frankfurter picks them up shortly after
+ECB_TIMEZONE = ZoneInfo("Europe/Berlin")
+PUBLICATION_TIME = datetime.time(16, 15)
+# seconds before the latest rates are fetched again when the API still returns the previous publication
+RETRY_AFTER = 300
+
+
+def to_iso_date(date):
+    """
+    Function that will convert a date (datetime.date, datetime.datetime or string) to an ISO formatted string (YYYY-MM-DD).
+
+    Parameters
+    ----------
+    date : datetime.date or str
+        Date to be converted
+
+    Returns
+    -------
+    str
+        ISO formatted date
+    """
+    if isinstance(date, datetime.datetime):
+        return date.date().isoformat()
+    if isinstance(date, datetime.date):
+        return date.isoformat()
+    return datetime.date.fromisoformat(str(date)).isoformat()
+
+
+def is_past_date(date):
+    """
+    Function that will check if the ECB has already published the rates of a date, i.e. if the date is not after the expected publication date.
+    Published rates never change, so only those can be stored permanently. The check follows the ECB publication time in Frankfurt
+    (see expected_publication_date), not the date of the host, so it does not depend on the timezone of the server.
+
+    Parameters
+    ----------
+    date : datetime.date or str
+        Date to be checked
+
+    Returns
+    -------
+    bool
+        True if the rates of the date have been published
+    """
+    return to_iso_date(date) <= expected_publication_date()
+
+
+class HistoricalRateStore:
+    """
+    Class that persists historical FX rates in a local SQLite database keyed by (date, base, quote).
+    Rates for past dates are immutable, so once a rate has been stored it can be served without any network call.
+
+    Parameters
+    ----------
+    path : str
+        Path to the SQLite database file (use ":memory:" for a throwaway store)
+    """
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        # Streamlit runs scripts in several threads, so the connection is shared behind a lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS historical_rates (
+                    date TEXT NOT NULL,
+                    base TEXT NOT NULL,
+                    quote TEXT NOT NULL,
+                    rate REAL NOT NULL,
+                    PRIMARY KEY (date, base, quote)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def get(self, date, base, quote):
+        """
+        Function that will look up a stored rate.
+
+        Parameters
+        ----------
+        date : datetime.date or str
+            Date of the rate
+        base : str
+            Code for the origin currency
+        quote : str
+            Code for the destination currency
+
+        Returns
+        -------
+        float
+            Stored rate or None if it is not in the store
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT rate FROM historical_rates WHERE date = ? AND base = ? AND quote = ?",
+                (to_iso_date(date), base, quote),
+            ).fetchone()
+        registry.inc("fx_cache_requests_total", layer="historical_sqlite", result="miss" if row is None else "hit")
+        return None if row is None else row[0]
+
+    def get_all(self, date, base):
+        """
+        Function that will look up all stored rates of one base currency for a date.
+
+        Parameters
+        ----------
+        date : datetime.date or str
+            Date of the rates
+        base : str
+            Code for the origin currency
+
+        Returns
+        -------
+        dict
+            Mapping of destination currency codes to rates (empty if nothing is stored)
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT quote, rate FROM historical_rates WHERE date = ? AND base = ?",
+                (to_iso_date(date), base),
+            ).fetchall()
+        registry.inc("fx_cache_requests_total", layer="historical_sqlite", result="hit" if rows else "miss")
+        return dict(rows)
+
+    def get_most_recent(self, base):
+        """
+        Function that will look up all stored rates of one base currency for the most recent stored date.
+
+        Parameters
+        ----------
+        base : str
+            Code for the origin currency
+
+        Returns
+        -------
+        str
+            Most recent stored date or None if nothing is stored
+        dict
+            Mapping of destination currency codes to rates (empty if nothing is stored)
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT MAX(date) FROM historical_rates WHERE base = ?", (base,)).fetchone()
+        if row is None or row[0] is None:
+            return None, {}
+        return row[0], self.get_all(row[0], base)
+
+    def put(self, date, base, quote, rate):
+        """
+        Function that will store a single rate.
+
+        Parameters
+        ----------
+        date : datetime.date or str
+            Date of the rate
+        base : str
+            Code for the origin currency
+        quote : str
+            Code for the destination currency
+        rate : float
+            FX rate between base and quote on that date
+        """
+        self.put_many(date, base, {quote: rate})
+
+    def put_many(self, date, base, rates):
+        """
+        Function that will store all the rates of one base currency for a date in a single transaction.
+
+        Parameters
+        ----------
+        date : datetime.date or str
+            Date of the rates
+        base : str
+            Code for the origin currency
+        rates : dict
+            Mapping of destination currency codes to rates
+        """
+        iso_date = to_iso_date(date)
+        rows = [(iso_date, base, quote, float(rate)) for quote, rate in rates.items()]
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO historical_rates VALUES (?, ?, ?, ?)", rows)
+
+    def close(self):
+        """
+        Function that will close the database connection.
+        """
+        with self.lock:
+            self.conn.close()
+
+
+# shared store used by frankfurter.py, created on first use
+_historical_store = None
+
+
+def get_historical_store():
+    """
+    Function that will return the shared historical rate store, opening it on first use.
+
+    Returns
+    -------
+    HistoricalRateStore
+        Shared store
+    """
+    global _historical_store
+    if _historical_store is None:
+        _historical_store = HistoricalRateStore(os.environ.get("FX_CACHE_PATH", DEFAULT_DB_PATH))
+    return _historical_store
+
+
+def set_historical_store(store):
+    """
+    Function that will replace the shared historical rate store.
+
+    Parameters
+    ----------
+    store : HistoricalRateStore
+        New store, or None to reopen the default one on next use
+
+    Returns
+    -------
+    HistoricalRateStore
+        Previous store
+    """
+    global _historical_store
+    previous = _historical_store
+    _historical_store = store
+    return previous
+
+
+def next_publication(now=None):
+    """
+    Function that will compute when the next set of ECB reference rates is expected to be published.
+    Rates are published once per business day (Monday to Friday) at PUBLICATION_TIME, Frankfurt time.
+
+    Parameters
+    ----------
+    now : datetime.datetime
+        Timezone aware current time (defaults to the current time)
+
+    Returns
+    -------
+    datetime.datetime
+        Timezone aware time of the next expected publication
+    """
+    if now is None:
+        now = datetime.datetime.now(ECB_TIMEZONE)
+    local_now = now.astimezone(ECB_TIMEZONE)
+    candidate = datetime.datetime.combine(local_now.date(), PUBLICATION_TIME, tzinfo=ECB_TIMEZONE)
+    # move to the next weekday if today's publication has passed or today is a weekend
+    while candidate <= local_now or candidate.weekday() > 4:
+        candidate = datetime.datetime.combine(candidate.date() + datetime.timedelta(days=1), PUBLICATION_TIME, tzinfo=ECB_TIMEZONE)
+    return candidate
+
+
+def expected_publication_date(now=None):
+    """
+    Function that will compute the date of the most recent ECB reference rates that should already be published.
+    Before PUBLICATION_TIME, today's rates are not expected yet; weekends and TARGET holidays are mapped to the previous business day.
+
+    Parameters
+    ----------
+    now : datetime.datetime
+        Timezone aware current time (defaults to the current time)
+
+    Returns
+    -------
+    str
+        ISO formatted date of the expected rates
+    """
+    # imported here because ecb_calendar.py depends on this module
+    from ecb_calendar import published_date
+    if now is None:
+        now = datetime.datetime.now(ECB_TIMEZONE)
+    local_now = now.astimezone(ECB_TIMEZONE)
+    day = local_now.date()
+    if local_now.time() < PUBLICATION_TIME:
+        day -= datetime.timedelta(days=1)
+    return published_date(day)
+
+
+class LatestRatesCache:
+    """
+    Class that keeps the latest FX rates in memory until the next expected ECB publication.
+    Expired entries are served stale-while-revalidate: the caller gets the previous value straight away while a background thread fetches the new one.
+    A value older than the expected publication (the API has not picked up the new rates yet) is kept but expires again after retry_after seconds,
+    so it is not served until the next day.
+
+    Parameters
+    ----------
+    expiry : function
+        Function returning the timezone aware expiry time of an entry loaded now (defaults to next_publication)
+    expected_date : function
+        Function returning the ISO formatted date of the rates expected now (defaults to expected_publication_date)
+    retry_after : float
+        Seconds before a value older than the expected publication is fetched again (defaults to RETRY_AFTER)
+    layer : str
+        Name of the cache in the metrics
+    """
+    def __init__(self, expiry=next_publication, expected_date=expected_publication_date, retry_after=RETRY_AFTER, layer="latest_memory"):
+        self.expiry = expiry
+        self.expected_date = expected_date
+        self.retry_after = retry_after
+        self.layer = layer
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.refreshing = set()
+
+    def get(self, key, loader):
+        """
+        Function that will return the cached value for a key, loading it with the provided loader if it is missing.
+        If the value has expired, it is still returned and a background refresh is started.
+        Values equal to None (or a tuple of None) and stale values are treated as failures and are not cached.
+
+        Parameters
+        ----------
+        key : hashable
+            Key of the entry, e.g. (from_currency, to_currency)
+        loader : function
+            Function without arguments returning a fresh value
+
+        Returns
+        -------
+        object
+            Cached or freshly loaded value
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None:
+            registry.inc("fx_cache_requests_total", layer=self.layer, result="miss")
+            return self._load(key, loader)
+        value, expires_at, behind = entry
+        # each lookup is counted once, hits on a value older than the expected publication being counted as behind
+        if time.time() >= expires_at:
+            registry.inc("fx_cache_requests_total", layer=self.layer, result="stale")
+            self._refresh_in_background(key, loader)
+        else:
+            registry.inc("fx_cache_requests_total", layer=self.layer, result="behind" if behind else "hit")
+        return value
+
+    def _load(self, key, loader):
+        value = loader()
+        if not self._is_failure(value):
+            behind = self._is_behind(value)
+            expires_at = time.time() + self.retry_after if behind else self.expiry().timestamp()
+            with self.lock:
+                self.entries[key] = (value, expires_at, behind)
+        return value
+
+    def _is_behind(self, value):
+        # values without a date (e.g. lists) are kept until the next publication
+        date = getattr(value, "date", None)
+        return date is not None and to_iso_date(date) < self.expected_date()
+
+    def _refresh_in_background(self, key, loader):
+        # only one refresh per key at a time
+        with self.lock:
+            if key in self.refreshing:
+                return
+            self.refreshing.add(key)
+
+        def refresh():
+            try:
+                self._load(key, loader)
+            finally:
+                with self.lock:
+                    self.refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    @staticmethod
+    def _is_failure(value):
+        # stale values served by the circuit breaker must not be cached as fresh ones
+        if getattr(value, "stale", False):
+            return True
+        if isinstance(value, tuple):
+            return all(item is None for item in value)
+        return value is None
+
+    def clear(self):
+        """
+        Function that will remove all cached entries.
+        """
+        with self.lock:
+            self.entries.clear()
+
+
+# shared cache for the latest rates, lives as long as the Streamlit server process
+latest_rates_cache = LatestRatesCache()
@@ -1,3 +1,4 @@
+import numpy as np
 
 def round_rate(rate):
     """
@@ -17,9 +18,10 @@ def round_rate(rate):
     return rounded_rate
     
 
-def reverse_rate(rate):
+def reverse_rate(rate, matrix=None, from_currency=None, to_currency=None):
     """
     Function that will calculate the inverse rate from the provided input rate.
+    If a RateMatrix and the currencies are provided, the inverse rate is read from the matrix instead.
     It will check if the provided input rate is not equal to zero.
     If it not the case, it will calculate the inverse rate and round it to 4 decimal places.
     Otherwise it will return zero.
@@ -29,11 +31,23 @@ def reverse_rate(rate):
     rate: float
         FX conversion rate to be inverted
 
+    matrix: frankfurter.RateMatrix
+        Matrix of all cross rates for the date of the rate (optional)
+
+    from_currency: string
+        Code for the origin currency of the rate (optional, used with matrix)
+
+    to_currency: string
+        Code for the destination currency of the rate (optional, used with matrix)
+
     Returns
     -------
     float
         Inverse of input FX conversion rate
     """
+    # read the inverse rate straight from the cross rate table when it is available
+    if matrix is not None and from_currency in matrix and to_currency in matrix:
+        return matrix.inverse_rate(from_currency, to_currency)
     # if input rate is zero, return zero
     if rate == 0:
         return 0
@@ -44,9 +58,10 @@ def reverse_rate(rate):
         return inverse_rate
 
   
-def format_output(date, from_currency, to_currency, rate, amount):
+def format_output(date, from_currency, to_currency, rate, amount, matrix=None):
     """
     Function that will format the output on the streamlit app. 
+    If a RateMatrix is provided, the rate and the inverse rate are read from it.
 
     Parameters
     ----------
@@ -65,14 +80,40 @@ def format_output(date, from_currency, to_currency, rate, amount):
     amount: float
         The volume of the origin currency to be converted.
 
+    matrix: frankfurter.RateMatrix
+        Matrix of all cross rates for the date (optional)
+
     Returns
     -------
     string
         A formatted string
     """
+    if matrix is not None and from_currency in matrix and to_currency in matrix:
+        rate = matrix.rate(from_currency, to_currency)
     converted_amount = round(amount * rate,2)
+    inverse_rate = round_rate(reverse_rate(rate, matrix, from_currency, to_currency))
     rate = round_rate(rate)
-    inverse_rate = round_rate(reverse_rate(rate))
     fstring = f"The conversion rate on {date} from {from_currency} to {to_currency} was {rate}. So {amount} in {from_currency} corresponded to {converted_amount} in {to_currency}. The inverse rate was {inverse_rate}."
     
-    return fstring
\ No newline at end of file
+    return fstring
+
+
+def convert_amounts(amounts, rates):
+    """
+    Function that will convert an amount or an array of amounts with an array of FX conversion rates in a single vectorized operation.
+    A single amount is converted with every rate, while an array of amounts is converted element-wise with the rate at the same position.
+
+    Parameters
+    ----------
+    amounts: float or array-like
+        The volume(s) of the origin currency to be converted.
+
+    rates: array-like
+        FX conversion rates, e.g. the rates returned by frankfurter.get_time_series
+
+    Returns
+    -------
+    np.ndarray
+        Converted amounts rounded to 2 decimal places
+    """
+    return np.round(np.asarray(amounts, dtype=np.float64) * np.asarray(rates, dtype=np.float64), 2)
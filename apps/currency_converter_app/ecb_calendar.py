@@ -0,0 +1,152 @@
+import datetime
+
+import numpy as np
+
+from cache import to_iso_date
+
+# first date on which the ECB published reference rates
+FIRST_PUBLICATION = np.datetime64("1999-01-04", "D")
+
+
+def easter_sunday(year):
+    """
+    Function that will compute the date of Easter Sunday for a year (Anonymous Gregorian algorithm).
+
+    Parameters
+    ----------
+    year : int
+        Year
+
+    Returns
+    -------
+    datetime.date
+        Date of Easter Sunday
+    """
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+def target_holidays(year):
+    """
+    Function that will list the TARGET closing days of a year, on which the ECB does not publish reference rates.
+
+    Parameters
+    ----------
+    year : int
+        Year
+
+    Returns
+    -------
+    list
+        Dates of the closing days
+    """
+    easter = easter_sunday(year)
+    holidays = [
+        datetime.date(year, 1, 1),
+        easter - datetime.timedelta(days=2),  # Good Friday
+        easter + datetime.timedelta(days=1),  # Easter Monday
+        datetime.date(year, 5, 1),
+        datetime.date(year, 12, 25),
+        datetime.date(year, 12, 26),
+    ]
+    # New Year's Eve was also a closing day at the start of the euro
+    if year in (1999, 2000, 2001):
+        holidays.append(datetime.date(year, 12, 31))
+    return holidays
+
+
+class BusinessDayCalendar:
+    """
+    Class that maps any calendar date to the ECB business day whose rates Frankfurter returns for it.
+    Weekends and TARGET holidays are mapped to the previous business day, like the API does.
+    The mapping is precomputed once for every day from the first publication to the end of next year, so each lookup is a single array index.
+    """
+    def __init__(self, end_year=None):
+        if end_year is None:
+            end_year = datetime.date.today().year + 1
+        self.start = FIRST_PUBLICATION
+        self.end = np.datetime64(f"{end_year}-12-31", "D")
+        holidays = [holiday for year in range(1999, end_year + 1) for holiday in target_holidays(year)]
+        days = np.arange(self.start, self.end + np.timedelta64(1, "D"), dtype="datetime64[D]")
+        self.published = np.busday_offset(days, 0, roll="backward", holidays=holidays)
+
+    def published_date(self, date):
+        """
+        Function that will return the date of the rates that are in force on a date.
+
+        Parameters
+        ----------
+        date : datetime.date or str
+            Requested date
+
+        Returns
+        -------
+        str
+            ISO formatted date of the business day whose rates apply (the requested date itself if it is outside the calendar)
+        """
+        iso_date = to_iso_date(date)
+        offset = int((np.datetime64(iso_date, "D") - self.start).astype(np.int64))
+        if offset < 0 or offset >= len(self.published):
+            return iso_date
+        return str(self.published[offset])
+
+    def is_business_day(self, date):
+        """
+        Function that will check if the ECB publishes reference rates on a date.
+
+        Parameters
+        ----------
+        date : datetime.date or str
+            Date to be checked
+
+        Returns
+        -------
+        bool
+            True if rates are published on that date
+        """
+        return self.published_date(date) == to_iso_date(date)
+
+
+# shared calendar, built on first use
+_calendar = None
+
+
+def get_calendar():
+    """
+    Function that will return the shared business day calendar, building it on first use.
+
+    Returns
+    -------
+    BusinessDayCalendar
+        Shared calendar
+    """
+    global _calendar
+    if _calendar is None:
+        _calendar = BusinessDayCalendar()
+    return _calendar
+
+
+def published_date(date):
+    """
+    Function that will map a requested date to the date of the rates Frankfurter returns for it, to be used as a cache key.
+
+    Parameters
+    ----------
+    date : datetime.date or str
+        Requested date
+
+    Returns
+    -------
+    str
+        ISO formatted date of the business day whose rates apply
+    """
+    return get_calendar().published_date(date)
@@ -1,11 +1,311 @@
-from api import get_url
+from api import get_response
+from breaker import CircuitBreaker
+from cache import get_historical_store, is_past_date, latest_rates_cache, to_iso_date
+from ecb_calendar import published_date
+from functools import lru_cache
+from metrics import registry
 import json
+import os
+import threading
+import numpy as np
+
+# can be pointed at a local stand-in server with the FRANKFURTER_URL environment variable
+BASE_URL = os.environ.get("FRANKFURTER_URL", "https://api.frankfurter.app")
+# all quotes are fetched against this base and cross rates are derived locally
+MATRIX_BASE = "EUR"
+# "api" to call Frankfurter, "offline" to answer from the ECB history imported with offline.py
+BACKEND = os.environ.get("FX_BACKEND", "api")
+
+
+class RateMatrix:
+    """
+    Class that holds every cross rate for one date as an N x N NumPy table built from a single API call.
+    The quotes of all currencies against one base are turned into cross rates with matrix[i, j] = quote[j] / quote[i],
+    so matrix[i, j] is the number of units of currency j for one unit of currency i and matrix[j, i] is its inverse.
+
+    Parameters
+    ----------
+    date : str
+        Date of the rates as returned by Frankfurter
+    base : str
+        Code for the currency the quotes are expressed against
+    rates : dict
+        Mapping of currency codes to their rate against base
+    stale : bool
+        True when the matrix is a last known value served while the API is unavailable
+    """
+    def __init__(self, date, base, rates, stale=False):
+        self.date = date
+        self.base = base
+        self.stale = stale
+        self.currencies = sorted(set(rates) | {base})
+        self.index = {currency: i for i, currency in enumerate(self.currencies)}
+        quotes = np.array([1.0 if currency == base else rates[currency] for currency in self.currencies], dtype=np.float64)
+        self.matrix = quotes[np.newaxis, :] / quotes[:, np.newaxis]
+
+    def __contains__(self, currency):
+        return currency in self.index
+
+    def as_stale(self):
+        """
+        Function that will return a copy of the matrix marked as stale, sharing the same table.
+
+        Returns
+        -------
+        RateMatrix
+            Stale copy of the matrix
+        """
+        matrix = object.__new__(RateMatrix)
+        matrix.__dict__.update(self.__dict__, stale=True)
+        return matrix
+
+    def rate(self, from_currency, to_currency):
+        """
+        Function that will look up the cross rate between two currencies.
+
+        Parameters
+        ----------
+        from_currency : str
+            Code for the origin currency
+        to_currency : str
+            Code for the destination currency
+
+        Returns
+        -------
+        float
+            FX conversion rate or None if either currency is not in the matrix
+        """
+        if from_currency not in self.index or to_currency not in self.index:
+            return None
+        return float(self.matrix[self.index[from_currency], self.index[to_currency]])
+
+    def quotes(self, currencies):
+        """
+        Function that will return the quotes of a list of currencies against the base of the matrix, aligned with the list.
+
+        Parameters
+        ----------
+        currencies : list
+            Codes of the currencies
+
+        Returns
+        -------
+        np.ndarray
+            Quotes against base (NaN for currencies that are not in the matrix)
+        """
+        base_row = self.matrix[self.index[self.base]]
+        positions = np.array([self.index.get(currency, -1) for currency in currencies], dtype=np.int64)
+        return np.where(positions >= 0, base_row[positions], np.nan)
+
+    def inverse_rate(self, from_currency, to_currency):
+        """
+        Function that will look up the inverse of the cross rate between two currencies.
+
+        Parameters
+        ----------
+        from_currency : str
+            Code for the origin currency
+        to_currency : str
+            Code for the destination currency
+
+        Returns
+        -------
+        float
+            Inverse FX conversion rate or None if either currency is not in the matrix
+        """
+        return self.rate(to_currency, from_currency)
+
+
+# circuit breaker shared by all calls to the Frankfurter API
+upstream_breaker = CircuitBreaker()
+
+
+def _latest_stored_matrix():
+    # when the API is down and there is no last known latest matrix, fall back to the most recent stored rates
+    date, rates = get_historical_store().get_most_recent(MATRIX_BASE)
+    return RateMatrix(date, MATRIX_BASE, rates) if rates else None
+
+
+def fetch_rate_matrix(date=None):
+    """
+    Function that will call the Frankfurter API once to get the quotes of all currencies for a date and build a RateMatrix from them.
+    The call goes through the circuit breaker: when the API is failing or too slow, the last known matrix for that date is returned marked as stale
+    (for the latest rates, the most recent stored rates are used if there is no last known matrix).
+
+    Parameters
+    ----------
+    date : datetime.date or str
+        Date of the rates (defaults to None for the latest rates)
+
+    Returns
+    -------
+    RateMatrix
+        Matrix of all cross rates or None in case of error
+    """
+    endpoint = 'latest' if date is None else to_iso_date(date)
+
+    def fetch():
+        # transport errors and 5xx responses raise, so the breaker counts them as failures, while a 404 (no rates for that date) is not one
+        response = get_response(f'{BASE_URL}/{endpoint}?from={MATRIX_BASE}')
+        if response.status_code != 200:
+            return None
+        json = response.json()
+        return RateMatrix(json['date'], json['base'], json['rates'])
+
+    # past matrices are kept in the historical rate store, so only the latest one is remembered by the breaker
+    if date is None:
+        return upstream_breaker.call(endpoint, fetch, fallback=_latest_stored_matrix)
+    return upstream_breaker.call(endpoint, fetch, remember=False)
+
+
+def stored_rate_matrix(iso_date):
+    """
+    Function that will build the RateMatrix of a past date from the local historical rate store.
+    The store is a blocking SQLite database, so asyncio code (async_frankfurter.py) calls it in a worker thread.
+
+    Parameters
+    ----------
+    iso_date : str
+        ISO formatted business day
+
+    Returns
+    -------
+    RateMatrix
+        Matrix of all cross rates or None if the date is not in the store
+    """
+    rates = get_historical_store().get_all(iso_date, MATRIX_BASE)
+    return RateMatrix(iso_date, MATRIX_BASE, rates) if rates else None
+
+
+def store_rate_matrix(iso_date, matrix):
+    """
+    Function that will save the quotes of a RateMatrix fetched for a past date in the local historical rate store.
+    Stale matrices served by the circuit breaker are not saved, nor matrices of another date (the API answers with the previous publication
+    until it has picked up the rates of the expected one).
+
+    Parameters
+    ----------
+    iso_date : str
+        ISO formatted business day
+    matrix : RateMatrix
+        Matrix fetched for that date
+
+    Returns
+    -------
+    bool
+        True if the matrix was saved
+    """
+    if matrix is None or matrix.stale or matrix.date != iso_date:
+        return False
+    get_historical_store().put_many(iso_date, MATRIX_BASE, {currency: matrix.rate(MATRIX_BASE, currency) for currency in matrix.currencies})
+    return True
+
+
+# set by _past_rate_matrix when it runs, so each thread can tell an lru_cache hit from a miss
+_lookup = threading.local()
+
+
+class _NotStored(LookupError):
+    # raised with a matrix that is returned but must not be cached, e.g. the previous publication while the API has not picked up the expected one
+    def __init__(self, iso_date, matrix):
+        super().__init__(f"Rates for {iso_date} could not be fetched")
+        self.matrix = matrix
+
+
+@lru_cache(maxsize=256)
+def _past_rate_matrix(iso_date):
+    _lookup.missed = True
+    # rates of past dates are immutable: check the local store first and fill it after an API call
+    matrix = stored_rate_matrix(iso_date)
+    if matrix is not None:
+        return matrix
+    matrix = fetch_rate_matrix(iso_date)
+    if not store_rate_matrix(iso_date, matrix):
+        # raising keeps the failure out of the lru_cache
+        raise _NotStored(iso_date, matrix)
+    return matrix
+
+
+# offline store, opened on first use
+_offline_store = None
+
+
+def set_backend(backend, offline_path=None):
+    """
+    Function that will switch between the Frankfurter API and the offline store for all rate lookups.
+
+    Parameters
+    ----------
+    backend : str
+        "api" or "offline"
+    offline_path : str
+        Folder of the offline store (defaults to the FX_OFFLINE_PATH environment variable or offline.DEFAULT_OFFLINE_PATH)
+    """
+    global BACKEND, _offline_store
+    if backend not in ("api", "offline"):
+        raise ValueError(f"Unknown backend {backend}, expected 'api' or 'offline'")
+    BACKEND = backend
+    _offline_store = None
+    if offline_path is not None:
+        os.environ["FX_OFFLINE_PATH"] = offline_path
+
+
+def get_offline_store():
+    """
+    Function that will return the offline store, opening it on first use.
+
+    Returns
+    -------
+    offline.OfflineRateStore
+        Memory-mapped store of the imported ECB history
+    """
+    global _offline_store
+    if _offline_store is None:
+        # imported here because offline.py depends on this module
+        from offline import DEFAULT_OFFLINE_PATH, OfflineRateStore
+        _offline_store = OfflineRateStore(os.environ.get("FX_OFFLINE_PATH", DEFAULT_OFFLINE_PATH))
+    return _offline_store
+
+
+def get_rate_matrix(date=None):
+    """
+    Function that will return the RateMatrix for a date, fetching it from the API only when it is not cached.
+    The latest matrix is kept until the next ECB publication and matrices of past dates are kept in memory and in the local historical rate store.
+    Past dates are first mapped to the business day whose rates apply, so a weekend or holiday shares the cache entry of the previous business day.
+
+    Parameters
+    ----------
+    date : datetime.date or str
+        Date of the rates (defaults to None for the latest rates)
+
+    Returns
+    -------
+    RateMatrix
+        Matrix of all cross rates or None in case of error
+    """
+    if BACKEND == "offline":
+        return get_offline_store().get_rate_matrix(date)
+    if date is None:
+        return latest_rates_cache.get('latest', fetch_rate_matrix)
+    # weekends and holidays return the previous business day's rates, so they share its cache entry
+    date = published_date(date)
+    if not is_past_date(date):
+        # rates after the expected ECB publication can still be published, so they are not stored permanently
+        return fetch_rate_matrix(date)
+    _lookup.missed = False
+    try:
+        return _past_rate_matrix(to_iso_date(date))
+    except _NotStored as not_stored:
+        # stale matrices of the breaker and matrices of the previous publication are returned without being cached
+        return not_stored.matrix
+    finally:
+        registry.inc("fx_cache_requests_total", layer="historical_memory", result="miss" if _lookup.missed else "hit")
 
-BASE_URL = "https://api.frankfurter.app"
 
 def get_currencies_list():
     """
     Function that will call the relevant API endpoint from Frankfurter in order to get the list of available currencies.
+    With the offline backend, the list is read from the offline store instead.
     After the API call, it will perform a check to see if the API call was successful.
     If it is the case, it will load the response as JSON, extract the list of currency codes and return it as Python list.
     Otherwise it will return the value None.
@@ -19,24 +319,30 @@ def get_currencies_list():
     list
         List of available currencies or None in case of error
     """
-    response = get_url(f'{BASE_URL}/currencies')
-    # check API call was successful
-    ## if get_url returns a string, the call failed
-    if isinstance(response, str):
-        return None
-    else:
-        # extract the json packet from successful response
-        json = response.json()
-        # extract list of currency codes from keys of the json
-        currency_list = list(json.keys())
-        # return the list
-        return currency_list
+    if BACKEND == "offline":
+        return get_offline_store().get_currencies_list()
+    def fetch():
+        response = get_response(f'{BASE_URL}/currencies')
+        # check API call was successful
+        ## get_response raises when the API could not answer, other error statuses return None
+        if response.status_code != 200:
+            return None
+        else:
+            # extract the json packet from successful response
+            json = response.json()
+            # extract list of currency codes from keys of the json
+            currency_list = list(json.keys())
+            # return the list
+            return currency_list
 
-def get_latest_rates(from_currency, to_currency, amount):
+    # when the API is failing or too slow, the circuit breaker returns the last known list
+    return upstream_breaker.call('currencies', fetch)
+
+def get_latest_rates(from_currency, to_currency, amount, matrix=None):
     """
-    Function that will call the relevant API endpoint from Frankfurter in order to get the latest conversion rate between the provided currencies. 
-    After the API call, it will perform a check to see if the API call was successful.
-    If it is the case, it will load the response as JSON, extract the latest conversion rate and the date and return them as 2 separate objects.
+    Function that will get the latest conversion rate between the provided currencies from the latest RateMatrix.
+    The matrix is fetched from Frankfurter with a single API call and kept in memory until the next expected ECB publication, after which it is refreshed in the background.
+    If the matrix could be loaded, it will extract the latest conversion rate and the date and return them as 2 separate objects.
     Otherwise it will return the value None twice.
 
     Parameters
@@ -47,6 +353,8 @@ def get_latest_rates(from_currency, to_currency, amount):
         Code for the destination currency
     amount : float
         The amount (in origin currency) to be converted
+    matrix : RateMatrix
+        Latest matrix already loaded by the caller with get_rate_matrix() (defaults to None to load it)
 
     Returns
     -------
@@ -55,21 +363,21 @@ def get_latest_rates(from_currency, to_currency, amount):
     float
         Latest FX conversion rate or None in case of error
     """
-    response = get_url(f'{BASE_URL}/latest?from={from_currency}&to={to_currency}')
-    if response.status_code==200:
-        json = response.json()
-        date = json['date']
-        rate = json['rates'][f'{to_currency}']
-        return date, rate
-    else:
+    if matrix is None:
+        matrix = get_rate_matrix()
+    if matrix is None:
+        return None, None
+    rate = matrix.rate(from_currency, to_currency)
+    if rate is None:
         return None, None
-    
+    return matrix.date, rate
 
-def get_historical_rate(from_currency, to_currency, from_date, amount):
+
+def get_historical_rate(from_currency, to_currency, from_date, amount, matrix=None):
     """
-    Function that will call the relevant API endpoint from Frankfurter in order to get the conversion rate for the given currencies and date
-    After the API call, it will perform a check to see if the API call was successful.
-    If it is the case, it will load the response as JSON, extract the conversion rate and return it.
+    Function that will get the conversion rate for the given currencies and date from the RateMatrix of that date.
+    The matrix is read from the local historical rate store when possible and otherwise fetched from Frankfurter with a single API call.
+    If the matrix could be loaded, it will extract the conversion rate and return it.
     Otherwise it will return the value None.
 
     Parameters
@@ -82,19 +390,67 @@ def get_historical_rate(from_currency, to_currency, from_date, amount):
         The amount (in origin currency) to be converted
     from_date : str
         Date when the conversion rate was recorded
+    matrix : RateMatrix
+        Matrix of from_date already loaded by the caller with get_rate_matrix() (defaults to None to load it)
 
     Returns
     -------
     float
         Latest FX conversion rate or None in case of error
     """
-    response = get_url(f'{BASE_URL}/{from_date}?from={from_currency}&to={to_currency}')
-    if response.status_code==200:
-        json = response.json()
-        rate = json['rates'][f'{to_currency}']
-        return rate
-    else:
+    if matrix is None:
+        matrix = get_rate_matrix(from_date)
+    if matrix is None:
         return None
+    return matrix.rate(from_currency, to_currency)
+
 
-    
+def get_time_series(from_currency, to_currency, start_date, end_date):
+    """
+    Function that will call the range endpoint from Frankfurter (/start..end) in order to get the conversion rates for every published date in a date range with a single API call.
+    The call goes through the circuit breaker like the other Frankfurter calls, so it is bounded by its latency budget and counted in its failures.
+    After the API call, it will perform a check to see if the API call was successful.
+    If it is the case, it will load the response as JSON and return the dates and rates as 2 aligned NumPy arrays sorted by date,
+    leaving out the dates on which the destination currency was not quoted (the arrays are empty if it was never quoted in the range).
+    Otherwise it will return the value None twice.
 
+    Parameters
+    ----------
+    from_currency : str
+        Code for the origin currency
+    to_currency : str
+        Code for the destination currency
+    start_date : datetime.date or str
+        First date of the range
+    end_date : datetime.date or str
+        Last date of the range
+
+    Returns
+    -------
+    np.ndarray
+        Dates (datetime64[D]) on which a rate was published or None in case of error
+    np.ndarray
+        FX conversion rates (float64) for each date or None in case of error
+    """
+    if BACKEND == "offline":
+        return get_offline_store().get_time_series(from_currency, to_currency, start_date, end_date)
+    endpoint = f'{to_iso_date(start_date)}..{to_iso_date(end_date)}'
+
+    def fetch():
+        # get_response raises UpstreamError when the API could not answer, so the breaker counts it as a failure
+        response = get_response(f'{BASE_URL}/{endpoint}?from={from_currency}&to={to_currency}')
+        if response.status_code != 200:
+            return None
+        json = response.json()
+        # Frankfurter returns the rates as a mapping of date to {currency: rate}
+        dates = sorted(json['rates'])
+        # some currencies are not quoted on every date of a range (e.g. ISK, HRK or RUB), those dates are dropped
+        rates = np.fromiter((json['rates'][date].get(to_currency, np.nan) for date in dates), dtype=np.float64, count=len(dates))
+        quoted = ~np.isnan(rates)
+        return np.array(dates, dtype='datetime64[D]')[quoted], rates[quoted]
+
+    # the arrays of a range are not kept as last known values, a failed or too slow call returns None
+    series = upstream_breaker.call((endpoint, from_currency, to_currency), fetch, remember=False)
+    if series is None:
+        return None, None
+    return series
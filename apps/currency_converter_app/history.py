@@ -0,0 +1,211 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from cache import expected_publication_date, to_iso_date
+from frankfurter import get_time_series
+
+# number of points drawn by default, roughly one per pixel of a chart in the centered Streamlit layout
+DEFAULT_WIDTH = 700
+# trading days used for the rolling statistics and to annualize the volatility
+DEFAULT_WINDOW = 20
+TRADING_DAYS = 252
+
+
+def lttb_indices(y, n_out):
+    """
+    Function that will select the points to keep with the Largest-Triangle-Three-Buckets algorithm.
+    The first and last points are kept and, in each of the n_out - 2 buckets in between, the point forming the largest triangle with the previously kept point
+    and the average of the next bucket is kept, which preserves the peaks and troughs of the series.
+    Points are assumed to be evenly spaced on the x axis.
+
+    Parameters
+    ----------
+    y : np.ndarray
+        Values of the series
+    n_out : int
+        Number of points to keep
+
+    Returns
+    -------
+    np.ndarray
+        Sorted indices of the kept points
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # average point of the next bucket (the last point for the last bucket)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[next_start:next_end].mean() if next_end > next_start else x[-1]
+        next_y = y[next_start:next_end].mean() if next_end > next_start else y[-1]
+        # twice the area of the triangle (previous, candidate, next average) for every candidate of the bucket
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous]) - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        indices[i + 1] = previous
+    return indices
+
+
+def minmax_indices(y, n_buckets):
+    """
+    Function that will keep the minimum and maximum point of each of n_buckets equal-size buckets, plus the first and last points.
+
+    Parameters
+    ----------
+    y : np.ndarray
+        Values of the series
+    n_buckets : int
+        Number of buckets (at most 2 * n_buckets + 2 points are kept)
+
+    Returns
+    -------
+    np.ndarray
+        Sorted unique indices of the kept points
+    """
+    n = len(y)
+    if 2 * n_buckets >= n:
+        return np.arange(n)
+    size = n // n_buckets
+    trimmed = y[:size * n_buckets].reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    kept = np.concatenate([[0, n - 1], offsets + trimmed.argmin(axis=1), offsets + trimmed.argmax(axis=1)])
+    return np.unique(kept)
+
+
+def rolling_mean(y, window):
+    """
+    Function that will compute the rolling mean of a series with cumulative sums (NaN for the first window - 1 points).
+
+    Parameters
+    ----------
+    y : np.ndarray
+        Values of the series
+    window : int
+        Number of points in the window
+
+    Returns
+    -------
+    np.ndarray
+        Rolling mean aligned with y
+    """
+    result = np.full(len(y), np.nan)
+    if len(y) >= window:
+        cumsum = np.cumsum(np.insert(y, 0, 0.0))
+        result[window - 1:] = (cumsum[window:] - cumsum[:-window]) / window
+    return result
+
+
+def rolling_volatility(y, window, periods=TRADING_DAYS):
+    """
+    Function that will compute the annualized rolling volatility (standard deviation of the daily log returns) of a series with cumulative sums.
+
+    Parameters
+    ----------
+    y : np.ndarray
+        Values of the series (must be positive)
+    window : int
+        Number of returns in the window
+    periods : int
+        Number of periods per year used to annualize the volatility
+
+    Returns
+    -------
+    np.ndarray
+        Rolling volatility aligned with y (NaN for the first window points)
+    """
+    result = np.full(len(y), np.nan)
+    returns = np.diff(np.log(y))
+    if len(returns) >= window:
+        sums = np.cumsum(np.insert(returns, 0, 0.0))
+        squares = np.cumsum(np.insert(returns ** 2, 0, 0.0))
+        window_sum = sums[window:] - sums[:-window]
+        window_squares = squares[window:] - squares[:-window]
+        # sample variance from the sums, clipped at 0 to absorb rounding errors
+        variance = np.clip((window_squares - window_sum ** 2 / window) / (window - 1), 0, None)
+        result[window:] = np.sqrt(variance * periods)
+    return result
+
+
+class _BehindPublication(Exception):
+    # raised with the history of a range whose last rate is older than the expected publication, so it is returned without being cached
+    def __init__(self, history):
+        super().__init__("The range does not hold the expected publication yet")
+        self.history = history
+
+
+def _build_history(from_currency, to_currency, start_date, end_date, width, method, window, publication=None):
+    dates, rates = get_time_series(from_currency, to_currency, start_date, end_date)
+    if dates is None or len(dates) == 0:
+        # raising keeps the failure out of the lru_cache
+        raise LookupError(f"No rates found for {from_currency}/{to_currency} from {start_date} to {end_date}")
+    history = _chart_history(dates, rates, width, method, window)
+    if publication is not None and dates[-1] < np.datetime64(publication, "D"):
+        raise _BehindPublication(history)
+    return history
+
+
+def _chart_history(dates, rates, width, method, window):
+    mean = rolling_mean(rates, window)
+    volatility = rolling_volatility(rates, window)
+    # the statistics are computed on the full series, only the points sent to the chart are downsampled
+    if method == "minmax":
+        kept = minmax_indices(rates, max(width // 2, 1))
+    else:
+        kept = lttb_indices(rates, width)
+    return pd.DataFrame({
+        "rate": rates[kept],
+        "rolling_mean": mean[kept],
+        "volatility": volatility[kept],
+    }, index=pd.to_datetime(dates[kept]))
+
+
+_cached_history = lru_cache(maxsize=64)(_build_history)
+
+
+def get_history(from_currency, to_currency, start_date, end_date, width=DEFAULT_WIDTH, method="lttb", window=DEFAULT_WINDOW):
+    """
+    Function that will fetch the rates of a pair over a date range with a single call, compute its rolling mean and volatility
+    and downsample it to about width points for charting.
+    Results are cached per (pair, range, width, method, window). A range reaching the latest publication is also keyed by the expected publication date,
+    so it is fetched again once the next rates are published, and it is only cached once the API returns the rates of that publication.
+
+    Parameters
+    ----------
+    from_currency : str
+        Code for the origin currency
+    to_currency : str
+        Code for the destination currency
+    start_date : datetime.date or str
+        First date of the range
+    end_date : datetime.date or str
+        Last date of the range
+    width : int
+        Number of points to keep, e.g. the width of the chart in pixels
+    method : str
+        Downsampling method, "lttb" (Largest-Triangle-Three-Buckets) or "minmax" (minimum and maximum of each bucket)
+    window : int
+        Number of trading days in the rolling window
+
+    Returns
+    -------
+    pd.DataFrame
+        Date-indexed rate, rolling_mean and volatility columns, or None in case of error
+    """
+    # a range ending on or after the latest publication gets a new rate with each publication
+    publication = expected_publication_date()
+    end_date = to_iso_date(end_date)
+    key = (from_currency, to_currency, to_iso_date(start_date), end_date, int(width), method, int(window), publication if end_date >= publication else None)
+    try:
+        return _cached_history(*key)
+    except _BehindPublication as behind:
+        return behind.history
+    except LookupError:
+        return None
@@ -0,0 +1,222 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+# upper bounds (in seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# description and type of every metric, used for the HELP and TYPE lines of the Prometheus text format
+METRICS = {
+    "fx_upstream_request_seconds": ("histogram", "Latency of the calls to the Frankfurter API by endpoint"),
+    "fx_upstream_responses_total": ("counter", "Responses of the Frankfurter API by endpoint and status code (error when no response was received)"),
+    "fx_upstream_retries_total": ("counter", "Retries made by the HTTP client by endpoint"),
+    "fx_coalesced_requests_total": ("counter", "Requests that shared an identical call already in flight instead of calling the API"),
+    "fx_cache_requests_total": ("counter", "Cache lookups by cache layer and result (hit, miss, stale or behind: a hit on rates older than the expected ECB publication)"),
+    "fx_breaker_transitions_total": ("counter", "Transitions of the circuit breaker by new state"),
+    "fx_breaker_fallbacks_total": ("counter", "Last known values served by the circuit breaker instead of calling the API"),
+}
+
+
+def endpoint_label(url):
+    """
+    Function that will turn a Frankfurter URL into a low-cardinality endpoint label.
+
+    Parameters
+    ----------
+    url : str
+        URL of the API call
+
+    Returns
+    -------
+    str
+        One of currencies, latest, range or date
+    """
+    path = urlparse(url).path.rstrip("/")
+    last = path.rsplit("/", 1)[-1]
+    if last in ("currencies", "latest"):
+        return last
+    return "range" if ".." in last else "date"
+
+
+class MetricsRegistry:
+    """
+    Class that records counters and latency histograms in memory and renders them in the Prometheus text format.
+    It is thread-safe, so it can be shared by the script threads of all Streamlit sessions.
+    """
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        """
+        Function that will increase a counter.
+
+        Parameters
+        ----------
+        name : str
+            Name of the counter
+        value : float
+            Increment
+        **labels : str
+            Labels of the counter
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """
+        Function that will record a value in a histogram.
+
+        Parameters
+        ----------
+        name : str
+            Name of the histogram
+        value : float
+            Observed value, e.g. a latency in seconds
+        **labels : str
+            Labels of the histogram
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.setdefault(key, {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def reset(self):
+        """
+        Function that will remove all recorded values.
+        """
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def render(self):
+        """
+        Function that will render all metrics in the Prometheus text exposition format.
+
+        Returns
+        -------
+        str
+            Metrics as Prometheus text
+        """
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = {key: dict(value, buckets=list(value["buckets"])) for key, value in self.histograms.items()}
+        lines = []
+        for name, (metric_type, description) in METRICS.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+            for (metric, labels), histogram in sorted(histograms.items()):
+                if metric == name:
+                    for bound, count in zip(self.buckets, histogram["buckets"]):
+                        lines.append(f"{name}_bucket{format_labels(labels + (('le', str(bound)),))} {count}")
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', '+Inf'),))} {histogram['count']}")
+                    lines.append(f"{name}_sum{format_labels(labels)} {histogram['sum']}")
+                    lines.append(f"{name}_count{format_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels):
+    """
+    Function that will format labels as {key="value",...} for the Prometheus text format.
+    """
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+# shared registry used by api.py, breaker.py, cache.py and frankfurter.py
+registry = MetricsRegistry()
+
+
+def dump_metrics(path=None):
+    """
+    Function that will return the current metrics as Prometheus text and optionally write them to a file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file to write (optional)
+
+    Returns
+    -------
+    str
+        Metrics as Prometheus text
+    """
+    text = registry.render()
+    if path is not None:
+        with open(path, "w") as metrics_file:
+            metrics_file.write(text)
+    return text
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(port=9100, host="127.0.0.1"):
+    """
+    Function that will serve the metrics on http://host:port/metrics from a background thread.
+
+    Parameters
+    ----------
+    port : int
+        Port of the server (0 picks a free port)
+    host : str
+        Address the server listens on
+
+    Returns
+    -------
+    ThreadingHTTPServer
+        Running server (call shutdown() to stop it)
+    """
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# server started by serve_metrics_from_env, kept so that Streamlit reruns do not start it again
+_metrics_server = None
+# Streamlit runs sessions in several threads, so the server is started behind a lock
+_metrics_server_lock = threading.Lock()
+
+
+def serve_metrics_from_env():
+    """
+    Function that will start the metrics server once per process on the port in the FX_METRICS_PORT environment variable, if it is set.
+
+    Returns
+    -------
+    ThreadingHTTPServer
+        Running server or None if FX_METRICS_PORT is not set
+    """
+    global _metrics_server
+    port = os.environ.get("FX_METRICS_PORT")
+    with _metrics_server_lock:
+        if _metrics_server is None and port:
+            _metrics_server = start_metrics_server(int(port))
+        return _metrics_server
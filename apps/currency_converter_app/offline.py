@@ -0,0 +1,177 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from cache import to_iso_date
+from frankfurter import MATRIX_BASE, RateMatrix
+
+# default location of the imported ECB history, can be overridden with the FX_OFFLINE_PATH environment variable
+DEFAULT_OFFLINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fx_offline")
+
+
+def import_ecb_csv(csv_path, path=DEFAULT_OFFLINE_PATH):
+    """
+    Function that will import the ECB historical reference rate CSV (eurofxref-hist.csv) into a columnar store that can be memory-mapped.
+    The store is a folder holding:
+        - dates.npy: sorted publication dates (datetime64[D])
+        - day_to_row.npy: for every calendar day from the first to the last date, the row of the last publication on or before that day
+        - one <CURRENCY>.npy file per currency with its rate against EUR for every publication date (float64, NaN when not quoted)
+        - meta.json: list of currencies and first date
+
+    Parameters
+    ----------
+    csv_path : str
+        Path to the ECB CSV file (one Date column and one column per currency, "N/A" for missing rates)
+    path : str
+        Folder where the store will be written
+
+    Returns
+    -------
+    int
+        Number of publication dates imported
+    """
+    df = pd.read_csv(csv_path, na_values=["N/A"], skipinitialspace=True)
+    # the ECB file ends each line with a comma, which creates an empty unnamed column
+    df = df.loc[:, ~df.columns.str.startswith("Unnamed")]
+    df.columns = df.columns.str.strip()
+    df["Date"] = pd.to_datetime(df["Date"]).values.astype("datetime64[D]")
+    df = df.sort_values("Date").drop_duplicates("Date", keep="last")
+
+    os.makedirs(path, exist_ok=True)
+    dates = df["Date"].to_numpy(dtype="datetime64[D]")
+    np.save(os.path.join(path, "dates.npy"), dates)
+
+    # map every calendar day to the last publication on or before it, so that any date is looked up in O(1)
+    days = np.arange(dates[0], dates[-1] + np.timedelta64(1, "D"), dtype="datetime64[D]")
+    day_to_row = np.searchsorted(dates, days, side="right").astype(np.int32) - 1
+    np.save(os.path.join(path, "day_to_row.npy"), day_to_row)
+
+    currencies = [column for column in df.columns if column != "Date"]
+    for currency in currencies:
+        np.save(os.path.join(path, f"{currency}.npy"), df[currency].to_numpy(dtype=np.float64))
+
+    with open(os.path.join(path, "meta.json"), "w") as meta_file:
+        json.dump({"base": MATRIX_BASE, "currencies": currencies, "start": str(dates[0])}, meta_file)
+    return len(dates)
+
+
+class OfflineRateStore:
+    """
+    Class that answers rate lookups from a store written by import_ecb_csv, without any network call.
+    All arrays are memory-mapped, so only the pages that are read are loaded in memory.
+
+    Parameters
+    ----------
+    path : str
+        Folder of the store
+    """
+    def __init__(self, path=DEFAULT_OFFLINE_PATH):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as meta_file:
+            meta = json.load(meta_file)
+        self.base = meta["base"]
+        self.currencies = meta["currencies"]
+        self.start = np.datetime64(meta["start"], "D")
+        self.dates = np.load(os.path.join(path, "dates.npy"), mmap_mode="r")
+        self.day_to_row = np.load(os.path.join(path, "day_to_row.npy"), mmap_mode="r")
+        self.columns = {currency: np.load(os.path.join(path, f"{currency}.npy"), mmap_mode="r") for currency in self.currencies}
+
+    def row_for(self, date=None):
+        """
+        Function that will find the row of the publication in force on a date, like Frankfurter does for weekends and holidays.
+
+        Parameters
+        ----------
+        date : datetime.date or str
+            Date of the rates (defaults to None for the latest rates)
+
+        Returns
+        -------
+        int
+            Row of the publication or None if the date is before the first publication
+        """
+        if date is None:
+            return len(self.dates) - 1
+        offset = int((np.datetime64(to_iso_date(date), "D") - self.start).astype(np.int64))
+        if offset < 0:
+            return None
+        # dates after the last publication get the latest rates
+        return int(self.day_to_row[min(offset, len(self.day_to_row) - 1)])
+
+    def get_currencies_list(self):
+        """
+        Function that will return the list of currencies in the store, including the base.
+
+        Returns
+        -------
+        list
+            List of available currencies
+        """
+        return sorted(set(self.currencies) | {self.base})
+
+    def get_rate_matrix(self, date=None):
+        """
+        Function that will build the RateMatrix of a date from the store.
+
+        Parameters
+        ----------
+        date : datetime.date or str
+            Date of the rates (defaults to None for the latest rates)
+
+        Returns
+        -------
+        RateMatrix
+            Matrix of all cross rates or None if the date is before the first publication
+        """
+        row = self.row_for(date)
+        if row is None:
+            return None
+        rates = {currency: float(column[row]) for currency, column in self.columns.items() if not np.isnan(column[row])}
+        return RateMatrix(str(self.dates[row]), self.base, rates)
+
+    def get_time_series(self, from_currency, to_currency, start_date, end_date):
+        """
+        Function that will return the rates between two currencies for every publication date in a date range.
+
+        Parameters
+        ----------
+        from_currency : str
+            Code for the origin currency
+        to_currency : str
+            Code for the destination currency
+        start_date : datetime.date or str
+            First date of the range
+        end_date : datetime.date or str
+            Last date of the range
+
+        Returns
+        -------
+        np.ndarray
+            Dates (datetime64[D]) on which a rate was published or None in case of error
+        np.ndarray
+            FX conversion rates (float64) for each date or None in case of error
+        """
+        if not all(currency == self.base or currency in self.columns for currency in (from_currency, to_currency)):
+            return None, None
+        first = np.searchsorted(self.dates, np.datetime64(to_iso_date(start_date), "D"), side="left")
+        last = np.searchsorted(self.dates, np.datetime64(to_iso_date(end_date), "D"), side="right")
+        ones = np.ones(last - first)
+        from_quotes = ones if from_currency == self.base else self.columns[from_currency][first:last]
+        to_quotes = ones if to_currency == self.base else self.columns[to_currency][first:last]
+        rates = np.asarray(to_quotes) / np.asarray(from_quotes)
+        dates = np.asarray(self.dates[first:last])
+        # drop the dates on which one of the currencies was not quoted
+        quoted = ~np.isnan(rates)
+        return dates[quoted], rates[quoted]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import the ECB historical reference rates CSV for offline use")
+    parser.add_argument("csv_path", help="path to eurofxref-hist.csv")
+    parser.add_argument("path", nargs="?", default=os.environ.get("FX_OFFLINE_PATH", DEFAULT_OFFLINE_PATH), help="folder of the offline store")
+    args = parser.parse_args()
+    n_dates = import_ecb_csv(args.csv_path, args.path)
+    print(f"Imported {n_dates} publication dates into {args.path}")
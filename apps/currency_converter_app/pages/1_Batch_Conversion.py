@@ -0,0 +1,87 @@
+import streamlit as st
+import gzip
+import io
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from api import UpstreamError
+from batch import COLUMNS, convert_batch, invalid_dates
+
+# results larger than this (after compression) are kept on disk instead of being offered for download, since Streamlit holds the data of a download button in memory
+MAX_DOWNLOAD_BYTES = 100 * 1024 * 1024
+# folder of the converted files, can be overridden with the FX_BATCH_OUTPUT_PATH environment variable
+OUTPUT_PATH = os.environ.get("FX_BATCH_OUTPUT_PATH", tempfile.gettempdir())
+# number of rows with an invalid date listed on the page
+MAX_REPORTED_ROWS = 20
+
+# main function
+def main():
+    # Display Streamlit Page Title
+    st.title("Batch FX Conversion")
+    st.write("Upload a CSV of transactions with the columns amount, from_currency, to_currency and date to convert every row.")
+
+    # Add a file uploader for the transactions
+    uploaded_file = st.file_uploader("Choose a CSV file of transactions", type="csv")
+    if uploaded_file is None:
+        return 0
+
+    # Add a number input for the number of rows converted at a time
+    chunksize = st.number_input(label="Rows converted at a time:", min_value=1000, value=100_000, step=1000)
+
+    if st.button(label="Convert Transactions"):
+        # stream the converted chunks to a gzip compressed file so that memory stays bounded
+        fd, output_path = tempfile.mkstemp(suffix=".csv.gz", prefix="converted_transactions_", dir=OUTPUT_PATH)
+        progress = st.empty()
+        n_rows = 0
+        n_missing = 0
+        bad_rows = []
+        n_bad = 0
+        try:
+            with open(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as compressed, io.TextIOWrapper(compressed, newline="") as output:
+                for i, converted in enumerate(convert_batch(uploaded_file, int(chunksize), COLUMNS)):
+                    converted.to_csv(output, header=i == 0, index=False)
+                    # rows whose date could not be parsed are converted to NaN and listed by their row number in the file (1 for the first transaction)
+                    invalid = np.flatnonzero(invalid_dates(converted, COLUMNS))
+                    n_bad += len(invalid)
+                    bad_rows.extend((n_rows + invalid[:MAX_REPORTED_ROWS - len(bad_rows)] + 1).tolist())
+                    n_rows += len(converted)
+                    n_missing += int(converted["rate"].isna().sum())
+                    progress.text(f"{n_rows} rows converted")
+                    # display a preview of the first chunk
+                    if i == 0:
+                        st.dataframe(converted.head(20))
+        except KeyError as error:
+            os.remove(output_path)
+            st.error(f"Error: column {error} could not be found in the uploaded file")
+            return 1
+        except (pd.errors.ParserError, UnicodeDecodeError) as error:
+            os.remove(output_path)
+            st.error(f"Error: the uploaded file could not be read as a UTF-8 CSV ({error})")
+            return 1
+        except ValueError as error:
+            # raised when a column holds values that cannot be converted, e.g. while parsing the dates
+            os.remove(output_path)
+            st.error(f"Error: the uploaded file could not be converted ({error})")
+            return 1
+        except UpstreamError as error:
+            os.remove(output_path)
+            st.error(f"Error: the Frankfurter API could not be reached, please try again later ({error})")
+            return 1
+        if n_bad:
+            st.warning(f"{n_bad} rows have an invalid date and were not converted, e.g. rows {', '.join(map(str, bad_rows))}")
+        if n_missing > n_bad:
+            st.text(f"No rate could be found for {n_missing - n_bad} other rows")
+        if os.path.getsize(output_path) > MAX_DOWNLOAD_BYTES:
+            st.text(f"The converted transactions are too large to be downloaded from the page and were saved to {output_path}")
+            return 0
+        with open(output_path, "rb") as output:
+            data = output.read()
+        os.remove(output_path)
+        # Add a button to download the converted transactions
+        st.download_button(label="Download Converted CSV (gzip)", data=data, file_name="converted_transactions.csv.gz", mime="application/gzip")
+
+# call main
+main()
@@ -0,0 +1,62 @@
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Set Python path to the app folder
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from api import get_url
+
+N_CALLERS = 20
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """
+    Class that answers every GET after a delay long enough for all the callers to be waiting on the same request.
+    """
+    def do_GET(self):
+        with self.server.lock:
+            self.server.hits.append(self.path)
+        time.sleep(0.5)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b'{"date": "2024-01-02", "rates": {"USD": 1.1}}')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    server.hits = []
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_concurrent_identical_calls_share_one_upstream_request(server):
+    url = f"http://127.0.0.1:{server.server_port}/latest?from=EUR"
+    barrier = threading.Barrier(N_CALLERS)
+    results = [None] * N_CALLERS
+
+    def caller(i):
+        barrier.wait()
+        results[i] = get_url(url)
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(N_CALLERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(server.hits) == 1
+    assert all(result is results[0] for result in results)
+    assert results[0].json()["rates"] == {"USD": 1.1}
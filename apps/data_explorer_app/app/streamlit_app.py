@@ -16,6 +16,9 @@ from tab_num.display import display_tab_num_content
 from tab_text.display import display_tab_text_content
 from tab_date.display import display_tab_date_content
 
+# Files larger than this (in bytes) are profiled chunk by chunk by default
+STREAMING_THRESHOLD = 500 * 1024 ** 2
+
 # Set Streamlit Page Configuration
 st.set_page_config(
     page_title="CSV Explorer",
@@ -41,15 +44,33 @@ st.title("CSV Explorer")
 # Add Window to upload CSV file
 with st.expander("ℹ️ - Streamlit application for performing data exploration on a CSV", expanded=True):
     st.session_state.file_path = st.file_uploader("Choose a CSV file")
+    streaming = False
+    optimize = False
+    if st.session_state.file_path is not None:
+        streaming = st.checkbox(
+            "Profile the file chunk by chunk (for files larger than memory, the column tabs only read the selected column)",
+            value=st.session_state.file_path.size > STREAMING_THRESHOLD,
+        )
+        optimize = st.checkbox(
+            "Optimize memory usage (downcast numeric columns and store repeated text as categories)",
+            disabled=streaming,
+        )
 
 # If a CSV file is uploaded, display the different tabs
 if st.session_state.file_path is not None:
     tab_df, tab_num, tab_text, tab_date = st.tabs(["DataFrame", "Numeric Series", "Text Series", "Datetime Series"])
     with tab_df:
-        display_tab_df_content(file_path=st.session_state.file_path)
-    with tab_num:
-        display_tab_num_content(df=st.session_state.dataset.df)
-    with tab_text:
-        display_tab_text_content(df=st.session_state.dataset.df)
-    with tab_date:
-        display_tab_date_content(df=st.session_state.dataset.df, file_path=st.session_state.file_path)
\ No newline at end of file
+        display_tab_df_content(file_path=st.session_state.file_path, streaming=streaming, optimize=optimize)
+    dataset = st.session_state.dataset
+    if dataset is not None and (not dataset.is_df_none() or not dataset.is_profile_none()):
+        # in streaming mode the tabs find their columns in the first rows, read only the selected column and take their statistics from the streaming profile
+        if not dataset.is_df_none():
+            df, profiler = dataset.df, dataset.profiler
+        else:
+            df, profiler = dataset.profile.head, dataset.profile
+        with tab_num:
+            display_tab_num_content(df=df, profiler=profiler, dataset=dataset)
+        with tab_text:
+            display_tab_text_content(df=df, profiler=profiler, dataset=dataset)
+        with tab_date:
+            display_tab_date_content(df=df, file_path=st.session_state.file_path, profiler=profiler, dataset=dataset)
\ No newline at end of file
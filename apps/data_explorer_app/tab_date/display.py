@@ -2,7 +2,7 @@ import streamlit as st
 
 from tab_date.logics import DateColumn
 
-def display_tab_date_content(file_path=None, df=None):
+def display_tab_date_content(file_path=None, df=None, profiler=None, dataset=None):
     """
     --------------------
     Description
@@ -21,6 +21,8 @@ def display_tab_date_content(file_path=None, df=None):
     --------------------
     -> file_path (str): File path to uploaded CSV file (optional)
     -> df (pd.DataFrame): Loaded dataframe (optional)
+    -> profiler (tab_df.profiler.Profiler): Profiler of the loaded dataframe (optional)
+    -> dataset (tab_df.logics.Dataset): Dataset through which the selected column is read (optional)
 
     --------------------
     Returns
@@ -29,7 +31,7 @@ def display_tab_date_content(file_path=None, df=None):
 
     """
     # instatiate a DateColumn object and save it into streamlit session state 
-    datecolumn = DateColumn(file_path=file_path, df=df) 
+    datecolumn = DateColumn(file_path=file_path, df=df, profiler=profiler, dataset=dataset)
     st.session_state["date_column"] = datecolumn 
     # find all datetime columns 
     datecolumn.find_date_cols() 
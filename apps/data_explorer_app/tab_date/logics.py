@@ -4,6 +4,9 @@ import numpy as np
 from datetime import datetime 
 import re 
 
+# pandas period frequency of each time bucket of the bar chart
+TIME_UNITS = {'year': 'Y', 'month': 'M', 'week': 'W', 'day': 'D'}
+
 class DateColumn:
     """
     --------------------
@@ -28,13 +31,19 @@ class DateColumn:
     -> n_empty_1900 (int): Number of times a series has dates equal to '1900-01-01' (optional)
     -> n_empty_1970 (int): Number of times a series has dates equal to '1970-01-01' (optional)
     -> barchart (int): Altair barchart displaying the count for each value of a series (optional)
+    -> time_unit (str): Size of the time buckets of the bar chart: 'year', 'month', 'week' or 'day' (optional)
+    -> buckets (pd.Dataframe): Dataframe with the bucket_start, bucket_end and count of each time bucket of the bar chart (optional)
     -> frequent (int): Dataframe containing the most frequest value of a series (optional)
+    -> profiler (tab_df.profiler.Profiler): Profiler of the dataframe, whose cached statistics replace the separate scans (optional)
+    -> dataset (tab_df.logics.Dataset): Dataset through which the selected column is read, so that only that column is loaded when the full dataframe is not in memory; df is then only used to find the datetime columns (optional)
 
     """
     # when the class is initialized, it will take the df from the session_state of streamlit_app.py 
-    def __init__(self, file_path=None, df=None):
+    def __init__(self, file_path=None, df=None, profiler=None, dataset=None):
         self.file_path = file_path
         self.df = df
+        self.profiler = profiler
+        self.dataset = dataset
         self.cols_list = []
         self.series = None
         self.n_unique = None
@@ -47,6 +56,8 @@ class DateColumn:
         self.n_empty_1900 = None
         self.n_empty_1970 = None
         self.barchart = alt.Chart()
+        self.time_unit = None
+        self.buckets = pd.DataFrame(columns=['bucket_start', 'bucket_end', 'count'])
         self.frequent = pd.DataFrame(columns=['value', 'occurrence', 'percentage'])
     
     def find_date_cols(self):
@@ -81,7 +92,7 @@ class DateColumn:
         if len(self.cols_list) < 1: 
             # try to find integer dtypes that are really years 
             num_cols = self.df.select_dtypes(include='number').columns.tolist() 
-            text_cols = self.df.select_dtypes(include='object').columns.tolist() 
+            text_cols = self.df.select_dtypes(include=['object', 'category']).columns.tolist() 
             dt_pattern = re.compile(r"year|yr|mon|week|wk|day|dob|date|time|hour|minute|sec", flags=re.IGNORECASE)
             # for each column in numbers, check if the following conditions are satisfied: 
             for col in num_cols: 
@@ -93,10 +104,32 @@ class DateColumn:
                     self.cols_list.append(col)
             # if resulting cols_list is still empty, extract text type columns 
             if len(self.cols_list) < 1: 
-                text_cols = self.df.select_dtypes(include='object')
+                text_cols = self.df.select_dtypes(include=['object', 'category'])
                 self.cols_list = text_cols 
     
 
+    def get_column(self, col_name):
+        """
+        --------------------
+        Description
+        --------------------
+        -> get_column (method): Class method that returns a column, read through self.dataset when it is provided (only that column is loaded when the full dataframe is not in memory) and from self.df otherwise
+
+        --------------------
+        Parameters
+        --------------------
+        -> col_name (str): Name of the column
+
+        --------------------
+        Returns
+        --------------------
+        -> (pd.Series): Column
+
+        """
+        if self.dataset is not None:
+            return self.dataset.read_columns([col_name])[col_name]
+        return self.df[col_name]
+
     def set_data(self, col_name):
         """
         --------------------
@@ -119,14 +152,21 @@ class DateColumn:
         -> None
         """
         # set self.series to the series for input column name
-        self.series = self.df[col_name] 
+        self.series = self.get_column(col_name)
 
         # if self.series is not datetime dtype, convert it 
         if self.series.dtype != 'datetime': 
             self.convert_series_to_date()
         
         ## check if series is empty  
-        if not self.is_series_none() and col_name in self.df.columns: 
+        if not self.is_series_none() and col_name in self.df.columns and self.profiler is not None: 
+            # statistics computed once per column and kept by the profiler
+            for name, value in self.profiler.date(col_name, self.series).items(): 
+                setattr(self, name, value) 
+            self.set_frequent() 
+            self.set_barchart() 
+
+        elif not self.is_series_none() and col_name in self.df.columns: 
         # compute info by calling on additional methods
             ## compute n_unique values 
             self.set_unique() 
@@ -181,15 +221,18 @@ class DateColumn:
         -> None
 
         """
+        # categories of an optimized Dataset would be parsed per category and kept as category dtype, so the values are parsed as objects
+        if isinstance(self.series.dtype, pd.CategoricalDtype): 
+            self.series = self.series.astype(object) 
         # handle year only formats 
         if re.search(r'year', self.series.name, re.IGNORECASE): 
             self.series = pd.to_datetime(self.series.astype(str) + "-01-01", errors='coerce')
             print(self.series.head(10))
         else: 
+            # the format is inferred from the first value (infer_datetime_format is the default since pandas 2.0 and was removed in pandas 3)
             self.series = pd.to_datetime(
                 self.series, 
-                errors='coerce',
-                infer_datetime_format=True
+                errors='coerce'
                 ) 
 
     def is_series_none(self):
@@ -418,7 +461,8 @@ class DateColumn:
         --------------------
         Description
         --------------------
-        -> set_barchart (method): Class method that computes the Altair barchart displaying the count for each value of a series and store the results in the relevant attribute(self.barchart).
+        -> set_barchart (method): Class method that computes the Altair barchart displaying the count of the series per time bucket and store the results in the relevant attribute(self.barchart).
+            The counts are computed on the server by set_buckets(), so only the buckets are sent to the browser and self.df is left unchanged.
 
         --------------------
         Parameters
@@ -432,30 +476,61 @@ class DateColumn:
 
         """
         if not self.is_series_none():
-            # calculate the distribution range in days 
-            date_range_days = (self.col_max - self.col_min).days 
-            print("Date range in days:", date_range_days)
-            # determine correct bin unit based on range 
-            if date_range_days > 365:
-                # if .n_weekend and .n_weekday are NA, we can assume the data is not denominated in days and so display only the Year
-                if pd.isna(self.n_weekend) and pd.isna(self.n_weekday): 
-                    self.df['Year'] = self.series.dt.year
-                    x_axis = alt.X('Year:O', title="Year") 
-                # otherwise we can display the date itself 
-                else: 
-                    x_axis = alt.X(f'{self.series.name}:T') 
-            elif date_range_days > 30: 
-                x_axis = alt.X(f'month({self.series.name}):T') 
-            elif date_range_days > 7: 
-                x_axis = alt.X(f'date({self.series.name}):T')
-            else:
-                x_axis = alt.X(f'date({self.series.name}):T') 
-
-            self.barchart = alt.Chart(self.df).mark_bar().encode(
-                x=x_axis, 
-                y='count()',
-                tooltip=[alt.Tooltip(f'{self.series.name}:T', title=self.series.name), 'count()']
+            self.set_buckets()
+            self.barchart = alt.Chart(self.buckets).mark_bar().encode(
+                x=alt.X('bucket_start:T', title=f"{self.series.name} (per {self.time_unit})"), 
+                x2='bucket_end:T', 
+                y=alt.Y('count:Q', title='Count'),
+                tooltip=[
+                    alt.Tooltip('bucket_start:T', title='From'), 
+                    alt.Tooltip('bucket_end:T', title='To'), 
+                    alt.Tooltip('count:Q', title='Count')
+                ]
             ).interactive()
+
+    def set_buckets(self):
+        """
+        --------------------
+        Description
+        --------------------
+        -> set_buckets (method): 
+            Class method that counts the dates of the series per year, month, week or day and store the results in the relevant attributes (self.time_unit and self.buckets). 
+            The bucket size depends on the date range: years above 3 years (or above 1 year when the series is not denominated in days), months above 1 year, weeks above 60 days and days otherwise. 
+            Empty buckets between the first and last date are kept with a count of 0.
+
+        --------------------
+        Parameters
+        --------------------
+        -> None
+
+        --------------------
+        Returns
+        --------------------
+        -> None
+
+        """
+        # calculate the distribution range in days 
+        date_range_days = (self.col_max - self.col_min).days 
+        # if .n_weekend and .n_weekday are NA, we can assume the data is not denominated in days and so count per year 
+        not_daily = pd.isna(self.n_weekend) and pd.isna(self.n_weekday) 
+        if date_range_days > 3 * 365 or (date_range_days > 365 and not_daily): 
+            self.time_unit = 'year' 
+        elif date_range_days > 365: 
+            self.time_unit = 'month' 
+        elif date_range_days > 60: 
+            self.time_unit = 'week' 
+        else: 
+            self.time_unit = 'day' 
+        # count the dates per period, the series itself is not modified 
+        periods = self.series.dropna().dt.to_period(TIME_UNITS[self.time_unit]) 
+        counts = periods.value_counts() 
+        full_range = pd.period_range(counts.index.min(), counts.index.max(), freq=TIME_UNITS[self.time_unit]) 
+        counts = counts.reindex(full_range, fill_value=0) 
+        self.buckets = pd.DataFrame({
+            'bucket_start': full_range.start_time, 
+            'bucket_end': full_range.end_time, 
+            'count': counts.values
+        })
       
     def set_frequent(self, end=20):
         """
@@ -505,7 +580,8 @@ class DateColumn:
         """
         # create dataframe with DateColumn attributes as values 
         summary_data = {
-            'Number of Unique Values': self.n_unique, 
+            # the streaming profile estimates the number of unique dates with a HyperLogLog
+            'Number of Unique Values (estimate, ±1.6%)' if getattr(self.profiler, 'approximate', False) else 'Number of Unique Values': self.n_unique, 
             'Number of Rows with Missing Values': self.n_missing, 
             'Number of Weekend Dates': self.n_weekend, 
             'Number of Weekday Dates': self.n_weekday, 
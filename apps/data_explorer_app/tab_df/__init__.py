@@ -1,6 +1,11 @@
 # __init__.py
 
 from .logics import Dataset
+from .artifacts import ArtifactCache, content_hash
+from .duplicates import DuplicateDetector, count_duplicates
+from .profiler import Profiler
+from .streaming import StreamingProfile
+from .cache import DatasetCache, get_dataset
 from .display import display_tab_df_content
 
-__all__ = ["Dataset", "display_tab_df_content"]
+__all__ = ["Dataset", "ArtifactCache", "content_hash", "DuplicateDetector", "count_duplicates", "Profiler", "StreamingProfile", "DatasetCache", "get_dataset", "display_tab_df_content"]
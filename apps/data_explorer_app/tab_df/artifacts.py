@@ -0,0 +1,201 @@
+import hashlib
+import os
+import threading
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
+# folder of the Feather copies of parsed CSVs, set DATA_EXPLORER_ARTIFACTS to "off" to disable them
+ARTIFACT_DIR = os.environ.get("DATA_EXPLORER_ARTIFACTS", os.path.join(os.path.expanduser("~"), ".cache", "data_explorer"))
+# maximum size on disk of the Feather copies (in bytes)
+MAX_ARTIFACT_BYTES = int(os.environ.get("DATA_EXPLORER_ARTIFACTS_MAX_BYTES", 2 * 1024 ** 3))
+# size of the blocks read when hashing a file
+HASH_BLOCK_SIZE = 8 * 1024 ** 2
+
+
+def content_hash(file_path):
+    """
+    --------------------
+    Description
+    --------------------
+    -> content_hash (function): Function that computes a hash of the content of an uploaded file (or of a file on disk), so that identical uploads share the same key
+
+    --------------------
+    Parameters
+    --------------------
+    -> file_path (UploadedFile or str): Uploaded file or path to a CSV file
+
+    --------------------
+    Returns
+    --------------------
+    -> (str): Hexadecimal BLAKE2b digest of the content
+
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(file_path, str):
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+    else:
+        # uploaded files are held in memory, reading their buffer does not copy it or move the read position
+        buffer = file_path.getbuffer() if hasattr(file_path, "getbuffer") else file_path.getvalue()
+        digest.update(buffer)
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """
+    --------------------
+    Description
+    --------------------
+    -> ArtifactCache (class): Class that keeps an uncompressed Feather (Arrow IPC) copy of every parsed CSV on disk, keyed by the hash of its content, so that uploading the same file again skips CSV parsing.
+        Copies are read back through a memory map, which lets Arrow share the file pages instead of copying them and lets callers read only the columns they need.
+        The least recently read copies are deleted when the folder goes over max_bytes. The cache is disabled when pyarrow is not installed or when directory is "off".
+
+    --------------------
+    Attributes
+    --------------------
+    -> directory (str): Folder of the Feather copies
+    -> max_bytes (int): Maximum total size of the Feather copies
+    -> enabled (bool): Whether copies are read and written
+
+    """
+    def __init__(self, directory=ARTIFACT_DIR, max_bytes=MAX_ARTIFACT_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = pa is not None and directory.lower() not in ("", "0", "off", "false")
+        self.lock = threading.Lock()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f"{key}.feather")
+
+    def read(self, key, columns=None):
+        """
+        --------------------
+        Description
+        --------------------
+        -> read (method): Class method that loads the Feather copy of a parsed CSV through a memory map
+
+        --------------------
+        Parameters
+        --------------------
+        -> key (str): Content hash of the CSV
+        -> columns (list): Names of the columns to read (optional, all columns by default)
+
+        --------------------
+        Returns
+        --------------------
+        -> (pd.DataFrame): Parsed CSV or None if there is no copy for this key
+
+        """
+        if not self.enabled:
+            return None
+        path = self.path_for(key)
+        try:
+            df = feather.read_feather(path, columns=columns, memory_map=True)
+        except (OSError, pa.ArrowException):
+            return None
+        # the modification time records the last read for the eviction order
+        os.utime(path)
+        return df
+
+    def write(self, key, df):
+        """
+        --------------------
+        Description
+        --------------------
+        -> write (method): Class method that saves an uncompressed Feather copy of a parsed CSV and evicts the least recently read copies until the folder fits in max_bytes.
+            Dataframes that Arrow cannot store (e.g. columns mixing numbers and text) are skipped.
+
+        --------------------
+        Parameters
+        --------------------
+        -> key (str): Content hash of the CSV
+        -> df (pd.DataFrame): Parsed CSV
+
+        --------------------
+        Returns
+        --------------------
+        -> None
+
+        """
+        if not self.enabled:
+            return
+        path = self.path_for(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # uncompressed files can be memory-mapped without decoding
+            feather.write_feather(df, temp_path, compression="uncompressed")
+            os.replace(temp_path, path)
+        except (OSError, ValueError, TypeError, pa.ArrowException):
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """
+        --------------------
+        Description
+        --------------------
+        -> evict (method): Class method that deletes the least recently read Feather copies until the folder fits in max_bytes
+
+        --------------------
+        Parameters
+        --------------------
+        -> None
+
+        --------------------
+        Returns
+        --------------------
+        -> None
+
+        """
+        with self.lock:
+            files = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".feather"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+            total_bytes = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total_bytes <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total_bytes -= size
+
+    def clear(self):
+        """
+        --------------------
+        Description
+        --------------------
+        -> clear (method): Class method that deletes all Feather copies
+
+        --------------------
+        Parameters
+        --------------------
+        -> None
+
+        --------------------
+        Returns
+        --------------------
+        -> None
+
+        """
+        if not os.path.isdir(self.directory):
+            return
+        with self.lock:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".feather"):
+                    os.remove(entry.path)
+
+
+# shared cache of Feather copies, used by tab_df.logics.Dataset.set_df
+artifact_cache = ArtifactCache()
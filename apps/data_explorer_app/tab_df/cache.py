@@ -0,0 +1,190 @@
+import threading
+from collections import OrderedDict
+
+from tab_df.artifacts import content_hash
+from tab_df.logics import Dataset
+
+# maximum memory footprint of the cached datasets (in bytes)
+MAX_CACHE_BYTES = 4 * 1024 ** 3
+
+
+class DatasetCache:
+    """
+    --------------------
+    Description
+    --------------------
+    -> DatasetCache (class): Class that keeps loaded tab_df.logics.Dataset instances across Streamlit reruns, keyed by the hash of the uploaded content.
+        The least recently used datasets are evicted when the total memory footprint goes over max_bytes.
+
+    --------------------
+    Attributes
+    --------------------
+    -> max_bytes (int): Maximum total memory footprint of the cached datasets
+    -> entries (OrderedDict): Cached datasets and their footprint, from least to most recently used
+    -> total_bytes (int): Current total memory footprint of the cached datasets
+    -> upload_keys (dict): Content hash of each upload id already hashed, so an upload is only hashed once
+
+    """
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.upload_keys = {}
+
+    def key_for(self, file_path):
+        """
+        --------------------
+        Description
+        --------------------
+        -> key_for (method): Class method that returns the cache key of an uploaded file, hashing its content only the first time the upload is seen
+
+        --------------------
+        Parameters
+        --------------------
+        -> file_path (UploadedFile or str): Uploaded file or path to a CSV file
+
+        --------------------
+        Returns
+        --------------------
+        -> (str): Content hash of the file
+
+        """
+        # UploadedFile.file_id in current Streamlit versions, UploadedFile.id in older ones (e.g. the pinned 1.13)
+        upload_id = getattr(file_path, "file_id", None)
+        if upload_id is None:
+            upload_id = getattr(file_path, "id", None)
+        if upload_id is None:
+            return content_hash(file_path)
+        with self.lock:
+            key = self.upload_keys.get(upload_id)
+        if key is None:
+            key = content_hash(file_path)
+            with self.lock:
+                self.upload_keys[upload_id] = key
+        return key
+
+    def get(self, key):
+        """
+        --------------------
+        Description
+        --------------------
+        -> get (method): Class method that returns the cached dataset for a key and marks it as most recently used
+
+        --------------------
+        Parameters
+        --------------------
+        -> key (str): Content hash of the file
+
+        --------------------
+        Returns
+        --------------------
+        -> (Dataset): Cached dataset or None if it is not in the cache
+
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, dataset, n_bytes):
+        """
+        --------------------
+        Description
+        --------------------
+        -> put (method): Class method that stores a dataset and evicts the least recently used ones until the cache fits in max_bytes.
+            A dataset larger than max_bytes on its own is not cached.
+
+        --------------------
+        Parameters
+        --------------------
+        -> key (str): Content hash of the file
+        -> dataset (Dataset): Loaded dataset
+        -> n_bytes (int): Memory footprint of the dataset
+
+        --------------------
+        Returns
+        --------------------
+        -> None
+
+        """
+        if n_bytes > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (dataset, n_bytes)
+            self.total_bytes += n_bytes
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_bytes
+
+    def clear(self):
+        """
+        --------------------
+        Description
+        --------------------
+        -> clear (method): Class method that removes all cached datasets
+
+        --------------------
+        Parameters
+        --------------------
+        -> None
+
+        --------------------
+        Returns
+        --------------------
+        -> None
+
+        """
+        with self.lock:
+            self.entries.clear()
+            self.upload_keys.clear()
+            self.total_bytes = 0
+
+
+# shared cache, kept for as long as the Streamlit server runs
+dataset_cache = DatasetCache()
+
+
+def get_dataset(file_path, streaming=False, optimize=False):
+    """
+    --------------------
+    Description
+    --------------------
+    -> get_dataset (function): Function that returns the loaded tab_df.logics.Dataset of an uploaded file, reusing the cached instance (parsed DataFrame and computed summary) when the same content has already been loaded
+
+    --------------------
+    Parameters
+    --------------------
+    -> file_path (UploadedFile or str): Uploaded file or path to a CSV file
+    -> streaming (bool): Whether to profile the file chunk by chunk instead of loading the full DataFrame
+    -> optimize (bool): Whether to downcast the numeric columns and convert low-cardinality text columns to category
+
+    --------------------
+    Returns
+    --------------------
+    -> (Dataset): Loaded dataset
+
+    """
+    key = dataset_cache.key_for(file_path)
+    if streaming:
+        key += ":streaming"
+    elif optimize:
+        key += ":optimized"
+    dataset = dataset_cache.get(key)
+    if dataset is None:
+        dataset = Dataset(file_path=file_path, streaming=streaming, optimize=optimize, key=key.split(":")[0])
+        dataset.set_data()
+        if dataset.table is not None:
+            # a streamed dataset only keeps its previews in memory, the cached dataset also keeps the uploaded bytes alive
+            if streaming:
+                previews = [dataset.profile.head, dataset.profile.tail, dataset.profile.sample]
+                n_bytes = sum(int(preview.memory_usage(deep=True).sum()) for preview in previews)
+            else:
+                n_bytes = int(dataset.table['memory'].sum())
+            n_bytes += getattr(file_path, "size", 0)
+            dataset_cache.put(key, dataset, n_bytes)
+    return dataset
@@ -1,13 +1,12 @@
 import streamlit as st
-from tab_df.logics import Dataset
+from tab_df.cache import get_dataset
 
-def display_tab_df_content(file_path):
-    # Instantiate Dataset class
-    dataset_instance = Dataset(file_path=file_path)
-    dataset_instance.set_data()
+def display_tab_df_content(file_path, streaming=False, optimize=False):
+    # Load the Dataset, reusing the cached instance if this content has already been parsed
+    dataset_instance = get_dataset(file_path, streaming=streaming, optimize=optimize)
 
     # Check if dataset has been loaded correctly
-    if dataset_instance.df is None:
+    if dataset_instance.df is None and dataset_instance.profile is None:
         st.error("Failed to load the dataset. Please make sure the uploaded file is a valid CSV.")
         return
 
@@ -25,10 +24,23 @@ def display_tab_df_content(file_path):
         st.subheader("Full Dataset Table")
         st.write(dataset_instance.table)
 
+        # Count duplicated rows on a subset of columns chosen by the user
+        st.subheader("Duplicated Rows on Selected Columns")
+        subset = st.multiselect("Columns compared to find duplicated rows", dataset_instance.cols_list)
+        if subset:
+            st.write(f"Number of duplicated rows on the selected columns: {dataset_instance.count_duplicates(subset)}")
+
+        # In streaming mode, display the statistics of each column computed chunk by chunk
+        if dataset_instance.streaming:
+            st.subheader("Column Statistics")
+            st.write(dataset_instance.get_column_summary())
+
     # Display slider and radio buttons to filter rows
     with st.expander("Explore Dataframe"):
         # Number of rows to display
         num_rows = st.slider("Select number of rows to be displayed", min_value=5, max_value=50, value=5)
+        if dataset_instance.streaming:
+            st.caption("Streaming mode: rows are taken from the first, last and a random sample of 50 rows kept while reading the file.")
         # Radio button to select head, tail, or random sample
         display_option = st.radio("Exploration Method", options=["Head", "Tail", "Sample"])
 
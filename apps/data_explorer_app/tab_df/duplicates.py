@@ -0,0 +1,327 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# multiplier used to combine the hashes of the columns of a row (64-bit FNV prime)
+HASH_PRIME = np.uint64(0x100000001B3)
+# default number of distinct rows and false positive rate of the approximate mode
+BLOOM_CAPACITY = 10_000_000
+BLOOM_ERROR_RATE = 0.001
+
+
+def column_hashes(serie):
+    """
+    --------------------
+    Description
+    --------------------
+    -> column_hashes (function): Function that computes a 64-bit hash of every value of a column (missing values all share the same hash)
+
+    --------------------
+    Parameters
+    --------------------
+    -> serie (pd.Series): Column of the dataframe
+
+    --------------------
+    Returns
+    --------------------
+    -> (np.ndarray): uint64 hash of each value
+
+    """
+    return pd.util.hash_pandas_object(serie, index=False).to_numpy()
+
+
+def combine_hashes(row_hashes, hashes):
+    """
+    --------------------
+    Description
+    --------------------
+    -> combine_hashes (function): Function that folds the hashes of one more column into the hashes of the rows (the order of the columns matters)
+
+    --------------------
+    Parameters
+    --------------------
+    -> row_hashes (np.ndarray): uint64 hash of each row for the columns already folded
+    -> hashes (np.ndarray): uint64 hash of each value of the next column
+
+    --------------------
+    Returns
+    --------------------
+    -> (np.ndarray): uint64 hash of each row
+
+    """
+    return (row_hashes ^ hashes) * HASH_PRIME
+
+
+def row_hashes(df, columns=None):
+    """
+    --------------------
+    Description
+    --------------------
+    -> row_hashes (function): Function that computes a 64-bit hash of every row of a dataframe, one column at a time, so that no full-size temporary frame is built
+
+    --------------------
+    Parameters
+    --------------------
+    -> df (pd.DataFrame): Dataframe or chunk of a CSV
+    -> columns (list): Names of the columns to hash (optional, all columns by default)
+
+    --------------------
+    Returns
+    --------------------
+    -> (np.ndarray): uint64 hash of each row
+
+    """
+    columns = list(df.columns) if columns is None else columns
+    hashes = np.zeros(len(df), dtype=np.uint64)
+    for col in columns:
+        hashes = combine_hashes(hashes, column_hashes(df[col]))
+    return hashes
+
+
+def rows_equal(left, right):
+    # compare two frames of the same shape row by row, missing values being equal to each other
+    equal = np.ones(len(left), dtype=bool)
+    for col in left.columns:
+        a = left[col].reset_index(drop=True)
+        b = right[col].reset_index(drop=True)
+        if isinstance(a.dtype, pd.CategoricalDtype) or isinstance(b.dtype, pd.CategoricalDtype):
+            a, b = a.astype(object), b.astype(object)
+        equal &= ((a == b) | (a.isna() & b.isna())).to_numpy(dtype=bool)
+    return equal
+
+
+class BloomFilter:
+    """
+    --------------------
+    Description
+    --------------------
+    -> BloomFilter (class): Probabilistic set of 64-bit hashes with a fixed memory footprint.
+        It is sized for capacity distinct hashes at a false positive rate of error_rate, i.e. m = -capacity * ln(error_rate) / ln(2)^2 bits and k = m / capacity * ln(2) bit positions per hash (about 1.8 bytes per distinct row at 0.1%).
+        A hash that was added is always found; a hash that was never added is wrongly found with probability error_rate as long as no more than capacity hashes were added (the rate grows past that).
+
+    --------------------
+    Attributes
+    --------------------
+    -> n_bits (int): Number of bits of the filter
+    -> n_hashes (int): Number of bit positions set for every hash
+    -> bits (np.ndarray): Bits of the filter, packed 8 per byte
+
+    """
+    def __init__(self, capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE):
+        self.n_bits = max(int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)), 8)
+        self.n_hashes = max(int(round(self.n_bits / capacity * math.log(2))), 1)
+        self.bits = np.zeros((self.n_bits + 7) // 8, dtype=np.uint8)
+
+    def positions(self, hashes):
+        # double hashing: the i-th position is h1 + i * h2, with h1 and h2 the two halves of the 64-bit hash
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(self.n_hashes, dtype=np.uint64)
+        return (h1[:, None] + steps[None, :] * h2[:, None]) % np.uint64(self.n_bits)
+
+    def contains(self, hashes):
+        positions = self.positions(hashes)
+        found = (self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return found.all(axis=1)
+
+    def add(self, hashes):
+        positions = self.positions(hashes).ravel()
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3), (1 << (positions & np.uint64(7))).astype(np.uint8))
+
+
+class DuplicateDetector:
+    """
+    --------------------
+    Description
+    --------------------
+    -> DuplicateDetector (class): Class that counts duplicated rows from 64-bit row hashes, one chunk at a time, optionally on a subset of columns.
+        In 'exact' mode, the first row of every distinct hash is kept and every later row with the same hash is compared with it value by value, so hash collisions are detected (and counted in n_collisions) rather than reported as duplicates. Memory grows with the number of distinct rows.
+        In 'approximate' mode, only a BloomFilter of the hashes is kept, so memory is fixed: duplicates are never missed, but up to error_rate of the distinct rows (past the first chunk) may be wrongly counted as duplicates.
+
+    --------------------
+    Attributes
+    --------------------
+    -> mode (str): 'exact' or 'approximate'
+    -> columns (list): Names of the columns compared (all columns when None)
+    -> n_rows (int): Number of rows checked
+    -> n_duplicates (int): Number of rows identical to an earlier row
+    -> n_collisions (int): Number of distinct rows sharing the hash of a different earlier row (exact mode only)
+
+    """
+    def __init__(self, mode='exact', columns=None, capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE, keep_rows=True):
+        if mode not in ('exact', 'approximate'):
+            raise ValueError(f"Unknown duplicate detection mode: {mode}")
+        self.mode = mode
+        self.columns = columns
+        self.keep_rows = keep_rows
+        self.n_rows = 0
+        self.n_duplicates = 0
+        self.n_collisions = 0
+        self.bloom = BloomFilter(capacity, error_rate) if mode == 'approximate' else None
+        # exact mode: first row of every distinct hash, stored as one frame per chunk
+        self.parts = []
+        self.part_offsets = np.zeros(1, dtype=np.int64)
+        self.seen = pd.Index([], dtype=np.uint64)
+        # exact mode: the other distinct rows of a hash already held by a different row
+        self.collided = {}
+        # data types of the first chunk, which the later chunks of non-numeric columns are cast to before hashing
+        self.dtypes = None
+
+    def update(self, chunk, hashes=None):
+        """
+        --------------------
+        Description
+        --------------------
+        -> update (method): Class method that checks the rows of a chunk against each other and against all the rows of the previous chunks
+
+        --------------------
+        Parameters
+        --------------------
+        -> chunk (pd.DataFrame): Dataframe or chunk of a CSV
+        -> hashes (np.ndarray): Row hashes of the chunk on the selected columns, when already computed (optional)
+
+        --------------------
+        Returns
+        --------------------
+        -> (int): Number of duplicated rows found in the chunk
+
+        """
+        if self.columns is not None:
+            chunk = chunk[self.columns]
+        if hashes is None:
+            hashes = self.chunk_hashes(chunk)
+        self.n_rows += len(chunk)
+        if self.mode == 'approximate':
+            found = self.update_approximate(hashes)
+        else:
+            found = self.update_exact(chunk, hashes)
+        self.n_duplicates += found
+        return found
+
+    def chunk_hashes(self, chunk):
+        # the chunks of a CSV can infer different data types for a column (e.g. int64, then float64 once a value is missing), and the hash of a value depends on its type,
+        # so each column is hashed with aligned_hashes() and the rows are compared on their original values
+        if self.dtypes is None:
+            self.dtypes = chunk.dtypes
+        hashes = np.zeros(len(chunk), dtype=np.uint64)
+        for col in chunk.columns:
+            hashes = combine_hashes(hashes, self.aligned_hashes(col, chunk[col]))
+        return hashes
+
+    def aligned_hashes(self, col, serie):
+        # numbers: integral values are hashed as int64 (exact for IDs above 2**53, and the same hash for 5 and 5.0), the other values as float64 and missing values as NaN
+        if pd.api.types.is_numeric_dtype(serie.dtype) and not pd.api.types.is_bool_dtype(serie.dtype):
+            values = serie.to_numpy(dtype=np.float64, na_value=np.nan)
+            if pd.api.types.is_integer_dtype(serie.dtype):
+                integral = ~serie.isna().to_numpy()
+                ints = serie.fillna(0).to_numpy(dtype=np.int64) if not integral.all() else serie.to_numpy(dtype=np.int64)
+            else:
+                integral = np.isfinite(values) & (values == np.trunc(values)) & (np.abs(values) < 2.0 ** 63)
+                ints = np.where(integral, values, 0).astype(np.int64)
+            hashes = column_hashes(pd.Series(ints))
+            if integral.all():
+                return hashes
+            return np.where(integral, hashes, column_hashes(pd.Series(values)))
+        first = self.dtypes[col] if col in self.dtypes.index else serie.dtype
+        if serie.dtype != first:
+            # a boolean column holding missing values is read as object: it is hashed as nullable booleans, as a cast to bool would turn NaN into True
+            target = 'boolean' if pd.api.types.is_bool_dtype(first) else first
+            try:
+                serie = serie.astype(target)
+            except (TypeError, ValueError):
+                pass
+        return column_hashes(serie)
+
+    def update_approximate(self, hashes):
+        # repeated hashes within the chunk are exact, the filter only answers for the first occurrences
+        repeated = pd.Series(hashes).duplicated().to_numpy()
+        firsts = hashes[~repeated]
+        found = int(repeated.sum()) + int(self.bloom.contains(firsts).sum())
+        self.bloom.add(firsts)
+        return found
+
+    def update_exact(self, chunk, hashes):
+        codes, uniques = pd.factorize(hashes)
+        first = np.full(len(uniques), len(codes), dtype=np.int64)
+        np.minimum.at(first, codes, np.arange(len(codes)))
+        is_first = np.zeros(len(codes), dtype=bool)
+        is_first[first] = True
+        # position of each row's hash among the rows kept from the previous chunks (-1 if new)
+        previous = self.seen.get_indexer(uniques)[codes] if len(self.seen) else np.full(len(codes), -1)
+
+        found = 0
+        different = []
+        # rows whose hash was seen in a previous chunk
+        rows = np.flatnonzero(previous >= 0)
+        if len(rows):
+            equal = self.compare_previous(chunk.iloc[rows], previous[rows])
+            found += int(equal.sum())
+            different.append(rows[~equal])
+        # later rows of a hash first seen in this chunk
+        rows = np.flatnonzero((previous < 0) & ~is_first)
+        if len(rows):
+            equal = rows_equal(chunk.iloc[rows], chunk.iloc[first[codes[rows]]])
+            found += int(equal.sum())
+            different.append(rows[~equal])
+        if different:
+            found += self.check_collisions(chunk, hashes, np.sort(np.concatenate(different)))
+
+        if self.keep_rows:
+            new = np.flatnonzero(is_first & (previous < 0))
+            if len(new):
+                self.parts.append(chunk.iloc[new])
+                self.part_offsets = np.append(self.part_offsets, self.part_offsets[-1] + len(new))
+                self.seen = self.seen.append(pd.Index(hashes[new]))
+        return found
+
+    def check_collisions(self, chunk, hashes, rows):
+        # rows differing from the first row of their hash are compared, in order, with the other distinct rows of that hash,
+        # so that only the first copy of a colliding row is a collision and its later copies are duplicates (collisions are rare)
+        found = 0
+        for row in rows:
+            values = chunk.iloc[[row]]
+            kept = self.collided.setdefault(int(hashes[row]), [])
+            if any(rows_equal(values, other)[0] for other in kept):
+                found += 1
+            else:
+                self.n_collisions += 1
+                kept.append(values)
+        return found
+
+    def compare_previous(self, rows, positions):
+        # the kept rows are spread over one frame per chunk, compare each group with its frame
+        equal = np.empty(len(rows), dtype=bool)
+        part_ids = np.searchsorted(self.part_offsets, positions, side='right') - 1
+        for part_id in np.unique(part_ids):
+            selected = np.flatnonzero(part_ids == part_id)
+            local = positions[selected] - self.part_offsets[part_id]
+            equal[selected] = rows_equal(rows.iloc[selected], self.parts[part_id].iloc[local])
+        return equal
+
+
+def count_duplicates(df, columns=None, mode='exact', hashes=None):
+    """
+    --------------------
+    Description
+    --------------------
+    -> count_duplicates (function): Function that counts the duplicated rows of a dataframe loaded in memory
+
+    --------------------
+    Parameters
+    --------------------
+    -> df (pd.DataFrame): Dataframe
+    -> columns (list): Names of the columns compared (optional, all columns by default)
+    -> mode (str): 'exact' or 'approximate'
+    -> hashes (np.ndarray): Row hashes of the dataframe on the selected columns, when already computed (optional)
+
+    --------------------
+    Returns
+    --------------------
+    -> (DuplicateDetector): Detector holding n_duplicates and n_collisions
+
+    """
+    # a single chunk does not need to keep its rows for later chunks
+    detector = DuplicateDetector(mode=mode, columns=columns, capacity=max(len(df), 1), keep_rows=False)
+    detector.update(df, hashes=hashes)
+    return detector
@@ -1,9 +1,54 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
 
+from tab_df.artifacts import artifact_cache, content_hash
+from tab_df.duplicates import DuplicateDetector, count_duplicates
+from tab_df.profiler import Profiler
+from tab_df.streaming import CHUNK_SIZE, StreamingProfile
+
+# text columns with at most this share of distinct values are converted to category in optimized mode
+CATEGORY_RATIO = 0.5
+# number of column selections read from disk kept in memory for the column tabs (one per tab)
+LOADED_COLUMNS = 3
+
+
+def optimize_serie(serie):
+    # integers go to the smallest (unsigned when possible) width holding their range
+    if pd.api.types.is_integer_dtype(serie.dtype) and not isinstance(serie.dtype, pd.CategoricalDtype):
+        return pd.to_numeric(serie, downcast='unsigned' if serie.min() >= 0 else 'integer')
+    # floats only go to float32 when every value survives the round trip
+    if pd.api.types.is_float_dtype(serie.dtype):
+        downcast = serie.astype(np.float32)
+        if np.array_equal(downcast.to_numpy(dtype=np.float64), serie.to_numpy(), equal_nan=True):
+            return downcast
+        return serie
+    # text columns with few distinct values are stored once per value, and only kept as category when it is smaller
+    if pd.api.types.is_string_dtype(serie.dtype) and serie.nunique() <= CATEGORY_RATIO * len(serie):
+        category = serie.astype('category')
+        if category.memory_usage(deep=True, index=False) < serie.memory_usage(deep=True, index=False):
+            return category
+    return serie
+
+
 class Dataset:
-    def __init__(self, file_path):
+    def __init__(self, file_path, streaming=False, chunksize=CHUNK_SIZE, optimize=False, key=None, duplicates_mode=None):
         self.file_path = file_path
+        self.key = key
+        self.streaming = streaming
+        # duplicated rows are counted exactly in memory and with a bounded-memory filter when streaming
+        self.duplicates_mode = duplicates_mode or ('approximate' if streaming else 'exact')
+        self.subset_duplicates = {}
+        self.chunksize = chunksize
+        self.optimize = optimize
         self.df = None
+        self.profile = None
+        self.profiler = None
+        self.memory_before = None
+        self.loaded_columns = OrderedDict()
+        self.lock = threading.Lock()
         self.cols_list = []
         self.n_rows = 0
         self.n_cols = 0
@@ -14,8 +59,14 @@ class Dataset:
         self.table = None
 
     def set_data(self):
+        if self.streaming:
+            self.set_streaming_profile()
+            return
         self.set_df()
         if not self.is_df_none():
+            if self.optimize:
+                self.set_optimized()
+            self.set_profiler()
             self.set_columns()
             self.set_dimensions()
             self.set_duplicates()  
@@ -26,7 +77,75 @@ class Dataset:
 
     def set_df(self):
         if self.df is None:
-            self.df = pd.read_csv(self.file_path)
+            # reuse the Feather copy of a CSV already parsed, otherwise parse it and save a copy
+            if artifact_cache.enabled and self.key is None:
+                self.key = content_hash(self.file_path)
+            if artifact_cache.enabled:
+                self.df = artifact_cache.read(self.key)
+            if self.df is None:
+                self.df = pd.read_csv(self.file_path)
+                if artifact_cache.enabled:
+                    artifact_cache.write(self.key, self.df)
+
+    def read_columns(self, columns):
+        # the column tabs only read the columns they display: from the DataFrame when it is loaded,
+        # otherwise from the memory-mapped Feather copy or the CSV, keeping the last LOADED_COLUMNS selections read
+        columns = list(columns)
+        if not self.is_df_none():
+            return pd.DataFrame({col: self.df[col] for col in columns}, copy=False)
+        key = tuple(columns)
+        with self.lock:
+            if key in self.loaded_columns:
+                self.loaded_columns.move_to_end(key)
+                return self.loaded_columns[key]
+            df = None
+            if artifact_cache.enabled:
+                if self.key is None:
+                    self.key = content_hash(self.file_path)
+                df = artifact_cache.read(self.key, columns=columns)
+            if df is None:
+                if hasattr(self.file_path, 'seek'):
+                    self.file_path.seek(0)
+                df = pd.read_csv(self.file_path, usecols=columns)
+            self.loaded_columns[key] = df
+            while len(self.loaded_columns) > LOADED_COLUMNS:
+                self.loaded_columns.popitem(last=False)
+        return df
+
+    def set_profiler(self):
+        # read every column once, the setters below then only copy the results
+        if not self.is_df_none() and self.profiler is None:
+            self.profiler = Profiler(self.df).run()
+
+    def set_optimized(self):
+        # keep the memory usage of the parsed columns to report it next to the optimized one
+        if not self.is_df_none() and self.memory_before is None:
+            self.memory_before = self.df.memory_usage(deep=True, index=False)
+            for col in self.df.columns:
+                self.df[col] = optimize_serie(self.df[col])
+
+    def set_streaming_profile(self):
+        # profile the CSV chunk by chunk, the full DataFrame is never built
+        if self.profile is None:
+            self.profile = StreamingProfile(duplicates=self.duplicates_mode).read_csv(self.file_path, chunksize=self.chunksize)
+        if self.profile.n_rows == 0:
+            return
+        self.cols_list = list(self.profile.kinds)
+        self.n_rows = self.profile.n_rows
+        self.n_cols = len(self.cols_list)
+        self.n_duplicates = self.profile.duplicates.n_duplicates
+        self.n_missing = self.profile.n_missing
+        self.n_num_cols = self.profile.n_cols_of('numeric')
+        # dates are read as text in memory, so date columns are counted with the text ones like tab_df.profiler.Profiler does
+        self.n_text_cols = self.profile.n_cols_of('text') + self.profile.n_cols_of('date')
+        self.table = pd.DataFrame({
+            'column': self.cols_list,
+            'data_type': list(self.profile.dtypes.values()),
+            'memory': list(self.profile.memory.values())
+        })
+
+    def is_profile_none(self):
+        return self.profile is None or self.profile.n_rows == 0
 
     def is_df_none(self):
         return self.df is None or self.df.empty
@@ -41,47 +160,86 @@ class Dataset:
 
     def set_duplicates(self):
         if not self.is_df_none():
-            self.n_duplicates = self.df.duplicated().sum()
+            if self.profiler is not None and self.duplicates_mode == 'exact':
+                self.n_duplicates = self.profiler.n_duplicates
+            else:
+                self.n_duplicates = count_duplicates(self.df, mode=self.duplicates_mode).n_duplicates
+
+    def count_duplicates(self, columns=None):
+        # duplicated rows on a subset of columns, read again chunk by chunk in streaming mode
+        key = tuple(columns) if columns else None
+        if key not in self.subset_duplicates:
+            if not self.is_df_none():
+                n_duplicates = count_duplicates(self.df, columns=columns, mode=self.duplicates_mode).n_duplicates
+            else:
+                detector = DuplicateDetector(mode=self.duplicates_mode)
+                if hasattr(self.file_path, 'seek'):
+                    self.file_path.seek(0)
+                for chunk in pd.read_csv(self.file_path, usecols=columns, chunksize=self.chunksize):
+                    detector.update(chunk if columns is None else chunk[columns])
+                n_duplicates = detector.n_duplicates
+            self.subset_duplicates[key] = n_duplicates
+        return self.subset_duplicates[key]
 
     def set_missing(self):
         if not self.is_df_none():
-            self.n_missing = self.df.isnull().sum().sum()
+            self.n_missing = self.profiler.n_missing if self.profiler is not None else self.df.isnull().sum().sum()
 
     def set_numeric(self):
         if not self.is_df_none():
-            self.n_num_cols = self.df.select_dtypes(include='number').shape[1]
+            self.n_num_cols = self.profiler.n_cols_of('numeric') if self.profiler is not None else self.df.select_dtypes(include='number').shape[1]
 
     def set_text(self):
         if not self.is_df_none():
-            self.n_text_cols = self.df.select_dtypes(include='object').shape[1]
+            self.n_text_cols = self.profiler.n_cols_of('text') if self.profiler is not None else self.df.select_dtypes(include=['object', 'category']).shape[1]
 
     def get_head(self, n=5):
         if not self.is_df_none():
             return self.df.head(n)
+        if not self.is_profile_none():
+            return self.profile.head.head(n)
 
     def get_tail(self, n=5):
         if not self.is_df_none():
             return self.df.tail(n)
+        if not self.is_profile_none():
+            return self.profile.tail.tail(n)
 
     def get_sample(self, n=5):
         if not self.is_df_none():
             return self.df.sample(n)
+        if not self.is_profile_none():
+            return self.profile.sample.sample(min(n, len(self.profile.sample)))
 
     def set_table(self):
-        if not self.is_df_none():
+        if not self.is_df_none() and self.profiler is not None:
+            self.table = self.profiler.get_table()
+        elif not self.is_df_none():
             self.table = pd.DataFrame({
             'column': self.df.columns,
             'data_type': self.df.dtypes.values, 
             'memory': self.df.memory_usage(deep=True, index=False).values  
         })
+        if self.table is not None and self.memory_before is not None:
+            self.table.insert(2, 'memory_before', self.memory_before.values)
+            self.table['memory_saved'] = (1 - self.table['memory'] / self.table['memory_before']).round(4)
 
 
     def get_summary(self):
         summary = {"Description": [
-            "Number of Rows", "Number of Columns", "Number of Duplicated Rows", "Number of Rows with Missing Values"
+            "Number of Rows", "Number of Columns",
+            "Number of Duplicated Rows" if self.duplicates_mode == 'exact' else "Number of Duplicated Rows (estimate)",
+            "Number of Rows with Missing Values"
             ],
              "Value": [
             self.n_rows, self.n_cols, self.n_duplicates, self.n_missing
             ]
             }
-        return pd.DataFrame(summary)
\ No newline at end of file
+        if self.memory_before is not None:
+            summary["Description"] += ["Memory Usage Before Optimization (bytes)", "Memory Usage After Optimization (bytes)"]
+            summary["Value"] += [int(self.table['memory_before'].sum()), int(self.table['memory'].sum())]
+        return pd.DataFrame(summary)
+
+    def get_column_summary(self):
+        if not self.is_profile_none():
+            return self.profile.column_summary()
\ No newline at end of file
@@ -0,0 +1,291 @@
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from tab_df.duplicates import column_hashes, combine_hashes, count_duplicates
+from tab_num.sketches import NumericSketch
+from tab_text.char_classes import profile_text
+
+
+def column_kind(serie):
+    """
+    --------------------
+    Description
+    --------------------
+    -> column_kind (function): Function that classifies a column as 'numeric', 'text', 'date' or 'other' from its data type
+
+    --------------------
+    Parameters
+    --------------------
+    -> serie (pd.Series): Column of the dataframe
+
+    --------------------
+    Returns
+    --------------------
+    -> (str): Kind of the column
+
+    """
+    dtype = serie.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'other'
+    if pd.api.types.is_numeric_dtype(dtype):
+        return 'numeric'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'date'
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(dtype):
+        return 'text'
+    return 'other'
+
+
+class Profiler:
+    """
+    --------------------
+    Description
+    --------------------
+    -> Profiler (class): Class that profiles a dataframe column by column, so that each column's buffer is read once for all the dataset-level statistics instead of once per statistic on the whole dataframe.
+        The pass over a column counts its missing values, measures its memory usage and folds its hashes into a 64-bit hash per row, which tab_df.duplicates.count_duplicates() then uses to count duplicated rows (with collision checks) without building pandas' factorization across all columns.
+        The detailed statistics of a column (read by tab_num.logics.NumericColumn, tab_text.logics.TextColumn and tab_date.logics.DateColumn) are computed on first request and kept, so selecting a column again does not scan it again.
+
+    --------------------
+    Attributes
+    --------------------
+    -> df (pd.DataFrame): Profiled dataframe
+    -> n_rows (int): Number of rows
+    -> n_cols (int): Number of columns
+    -> n_missing (int): Number of missing cells
+    -> n_duplicates (int): Number of duplicated rows
+    -> kinds (dict): Kind of each column ('numeric', 'text', 'date' or 'other')
+    -> missing (dict): Number of missing values of each column
+    -> memory (dict): Memory usage of each column
+    -> row_hashes (np.ndarray): 64-bit hash of each row
+
+    """
+    # the statistics are exact (tab_df.streaming.StreamingProfile estimates them)
+    approximate = False
+
+    def __init__(self, df):
+        self.df = df
+        self.n_rows, self.n_cols = df.shape
+        self.n_missing = 0
+        self.n_duplicates = 0
+        self.kinds = {}
+        self.missing = {}
+        self.memory = {}
+        self.row_hashes = None
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def run(self):
+        """
+        --------------------
+        Description
+        --------------------
+        -> run (method): Class method that reads every column once and computes the dataset-level statistics
+
+        --------------------
+        Parameters
+        --------------------
+        -> None
+
+        --------------------
+        Returns
+        --------------------
+        -> (Profiler): The profiler itself
+
+        """
+        row_hashes = np.zeros(self.n_rows, dtype=np.uint64)
+        for position, col in enumerate(self.df.columns):
+            serie = self.df.iloc[:, position]
+            self.kinds[col] = column_kind(serie)
+            self.missing[col] = int(serie.isna().sum())
+            self.memory[col] = int(serie.memory_usage(deep=True, index=False))
+            row_hashes = combine_hashes(row_hashes, column_hashes(serie))
+        self.row_hashes = row_hashes
+        self.n_missing = sum(self.missing.values())
+        self.n_duplicates = count_duplicates(self.df, hashes=row_hashes).n_duplicates
+        return self
+
+    def n_cols_of(self, kind):
+        return sum(1 for k in self.kinds.values() if k == kind)
+
+    def get_table(self):
+        """
+        --------------------
+        Description
+        --------------------
+        -> get_table (method): Class method that formats the name, data type and memory usage of every column as a Pandas dataframe
+
+        --------------------
+        Parameters
+        --------------------
+        -> None
+
+        --------------------
+        Returns
+        --------------------
+        -> (pd.DataFrame): One row per column with column, data_type and memory
+
+        """
+        return pd.DataFrame({
+            'column': self.df.columns,
+            'data_type': self.df.dtypes.values,
+            'memory': list(self.memory.values())
+        })
+
+    def get_stats(self, col_name, kind, compute):
+        # compute the statistics of a column once, several Streamlit sessions can share the profiler
+        key = (col_name, kind)
+        with self.lock:
+            if key in self.stats:
+                return self.stats[key]
+        result = compute()
+        with self.lock:
+            self.stats[key] = result
+        return result
+
+    def numeric(self, col_name, sketch=False):
+        """
+        --------------------
+        Description
+        --------------------
+        -> numeric (method): Class method that returns the statistics of a column converted to numeric values (non-numeric values become missing), computed on its float64 buffer
+
+        --------------------
+        Parameters
+        --------------------
+        -> col_name (str): Name of the column
+        -> sketch (bool): Whether to estimate n_unique and the quantiles with tab_num.sketches.NumericSketch instead of a full hash table and sort
+
+        --------------------
+        Returns
+        --------------------
+        -> (dict): n_unique, n_missing, col_mean, col_std, col_min, col_max, col_median, n_zeros and n_negatives (plus quantiles when sketch is True)
+
+        """
+        kind = 'numeric_sketch' if sketch else 'numeric'
+        return self.get_stats(col_name, kind, lambda: numeric_stats(self.df[col_name], sketch=sketch))
+
+    def text(self, col_name):
+        """
+        --------------------
+        Description
+        --------------------
+        -> text (method): Class method that returns the statistics of a column converted to text
+
+        --------------------
+        Parameters
+        --------------------
+        -> col_name (str): Name of the column
+
+        --------------------
+        Returns
+        --------------------
+        -> (dict): n_unique, n_missing, n_empty, n_mode, n_space, n_lower, n_upper, n_alpha and n_digit, and the len_min, len_mean, len_max and len_p25/len_p50/len_p75/len_p95 string lengths
+
+        """
+        return self.get_stats(col_name, 'text', lambda: text_stats(self.df[col_name], self.text_counts(col_name)))
+
+    def text_counts(self, col_name):
+        """
+        --------------------
+        Description
+        --------------------
+        -> text_counts (method): Class method that returns the number of occurrences of every value of a column converted to text (missing values become ''), computed once and shared by the text statistics, bar chart and frequent values table
+
+        --------------------
+        Parameters
+        --------------------
+        -> col_name (str): Name of the column
+
+        --------------------
+        Returns
+        --------------------
+        -> (pd.Series): Occurrences of each value, most frequent first
+
+        """
+        return self.get_stats(col_name, 'text_counts', lambda: to_text(self.df[col_name]).value_counts())
+
+    def date(self, col_name, series):
+        """
+        --------------------
+        Description
+        --------------------
+        -> date (method): Class method that returns the statistics of a column already converted to datetime by tab_date.logics.DateColumn.convert_series_to_date()
+
+        --------------------
+        Parameters
+        --------------------
+        -> col_name (str): Name of the column
+        -> series (pd.Series): Column converted to datetime
+
+        --------------------
+        Returns
+        --------------------
+        -> (dict): n_unique, n_missing, col_min, col_max, n_weekend, n_weekday, n_future, n_empty_1900 and n_empty_1970
+
+        """
+        return self.get_stats(col_name, 'date', lambda: date_stats(series))
+
+
+def numeric_stats(serie, sketch=False):
+    values = pd.to_numeric(serie, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = values[~np.isnan(values)]
+    n = len(valid)
+    stats = {
+        'n_missing': len(values) - n,
+        'col_mean': valid.mean() if n else np.nan,
+        'col_std': valid.std(ddof=1) if n > 1 else np.nan,
+        'col_min': valid.min() if n else np.nan,
+        'col_max': valid.max() if n else np.nan,
+        'n_zeros': int(np.count_nonzero(valid == 0)),
+        'n_negatives': int(np.count_nonzero(valid < 0)),
+    }
+    if sketch:
+        # bounded-memory estimates instead of a full hash table and sort, see tab_num.sketches for their error bounds
+        sketches = NumericSketch()
+        sketches.update(valid)
+        stats.update(sketches.result())
+    else:
+        stats.update(n_unique=len(pd.unique(valid)), col_median=np.median(valid) if n else np.nan)
+    return stats
+
+
+def to_text(serie):
+    return serie.astype(object).where(serie.notna(), '').astype(str)
+
+
+def mode_of(counts):
+    # same value as pd.Series.mode(): the smallest of the most frequent values
+    return counts.index[counts == counts.iloc[0]].min() if not counts.empty else None
+
+
+def text_stats(serie, counts):
+    stats = {
+        'n_unique': len(counts),
+        'n_missing': int(serie.isna().sum()),
+        'n_mode': mode_of(counts),
+    }
+    # the character classes and lengths of every value are computed in one pass
+    stats.update(profile_text(to_text(serie)))
+    return stats
+
+
+def date_stats(series):
+    # weekdays and days are computed once and shared by the weekend and weekday counts
+    days = series.dt.day
+    weekdays = series.dt.weekday
+    # if all days are the same, the series is likely not denominated in days
+    by_day = days.nunique() >= 2
+    return {
+        'n_unique': series.nunique(),
+        'n_missing': series.isnull().sum(),
+        'col_min': series.min(),
+        'col_max': series.max(),
+        'n_weekend': int((weekdays > 4).sum()) if by_day else pd.NA,
+        'n_weekday': int((weekdays < 5).sum()) if by_day else pd.NA,
+        'n_future': int((series > datetime.now()).sum()),
+        'n_empty_1900': series[series == '1900-01-01'].count(),
+        'n_empty_1970': series[series == '1970-01-01'].count(),
+    }
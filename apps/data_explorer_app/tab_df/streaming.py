@@ -0,0 +1,555 @@
+import warnings
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from tab_df.duplicates import DuplicateDetector
+from tab_df.profiler import date_stats, to_text
+from tab_num.sketches import HyperLogLog, KLLSketch, NumericSketch
+from tab_text.char_classes import LENGTH_PERCENTILES, classify_text
+from tab_text.heavy_hitters import MisraGries
+
+# number of rows read at a time in streaming mode
+CHUNK_SIZE = 200_000
+# number of rows kept for the head, tail and sample previews
+PREVIEW_ROWS = 50
+# number of values of a text column parsed before the whole chunk is checked for dates
+DATE_SAMPLE_ROWS = 100
+
+
+def parse_dates(values):
+    """
+    --------------------
+    Description
+    --------------------
+    -> parse_dates (function): Function that parses text values as dates, the unparsable values becoming NaT
+
+    --------------------
+    Parameters
+    --------------------
+    -> values (pd.Series): Values of a text column
+
+    --------------------
+    Returns
+    --------------------
+    -> (pd.Series): Parsed dates
+
+    """
+    with warnings.catch_warnings():
+        # pandas warns when the format cannot be inferred and each value is parsed on its own
+        warnings.simplefilter('ignore', UserWarning)
+        return pd.to_datetime(values, errors='coerce')
+
+
+def observed_kind(serie):
+    """
+    --------------------
+    Description
+    --------------------
+    -> observed_kind (function): Function that classifies the values of a column in one chunk as 'numeric', 'date' or 'text'.
+        Numbers are recognized from the data type and dates by parsing the text values, a text column being a date column only when every value parses.
+
+    --------------------
+    Parameters
+    --------------------
+    -> serie (pd.Series): Column of a chunk
+
+    --------------------
+    Returns
+    --------------------
+    -> (str): Kind of the values, or None when they are all missing
+    -> (pd.Series): Parsed dates when the kind is 'date', None otherwise
+
+    """
+    values = serie.dropna()
+    if values.empty:
+        return None, None
+    if pd.api.types.is_bool_dtype(serie.dtype):
+        return 'text', None
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        return 'numeric', None
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        return 'date', serie
+    # a small sample rules out most text columns before the whole chunk is parsed
+    if parse_dates(values.head(DATE_SAMPLE_ROWS)).isna().any():
+        return 'text', None
+    dates = parse_dates(serie)
+    if dates[serie.notna()].isna().any():
+        return 'text', None
+    return 'date', dates
+
+
+def combine_kinds(kind, other):
+    """
+    --------------------
+    Description
+    --------------------
+    -> combine_kinds (function): Function that returns the kind of a column whose chunks hold values of two kinds, columns mixing kinds being read as text like pd.read_csv reads them as objects
+
+    --------------------
+    Parameters
+    --------------------
+    -> kind (str): Kind of the column so far, or None when no value was seen
+    -> other (str): Kind of the values of a new chunk, or None when they are all missing
+
+    --------------------
+    Returns
+    --------------------
+    -> (str): Kind of the column
+
+    """
+    if kind is None or kind == other:
+        return other
+    if other is None:
+        return kind
+    return 'text'
+
+
+
+class NumericAccumulator:
+    """
+    --------------------
+    Description
+    --------------------
+    -> NumericAccumulator (class): Mergeable accumulator of the statistics of a numeric column read in chunks.
+        The mean and variance are merged with Chan's parallel algorithm, so merging the accumulators of two chunks gives the same result as reading them at once.
+        The number of unique values and the median are estimated with mergeable sketches (tab_num.sketches.NumericSketch).
+
+    """
+    def __init__(self):
+        self.n = 0
+        self.n_missing = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.col_min = np.nan
+        self.col_max = np.nan
+        self.n_zeros = 0
+        self.n_negatives = 0
+        self.sketch = NumericSketch()
+
+    def update(self, serie):
+        values = pd.to_numeric(serie, errors='coerce').to_numpy(dtype=np.float64)
+        missing = np.isnan(values)
+        other = NumericAccumulator()
+        other.n_missing = int(missing.sum())
+        values = values[~missing]
+        if len(values):
+            other.n = len(values)
+            other.mean = float(values.mean())
+            other.m2 = float(((values - other.mean) ** 2).sum())
+            other.col_min = float(values.min())
+            other.col_max = float(values.max())
+            other.n_zeros = int((values == 0).sum())
+            other.n_negatives = int((values < 0).sum())
+            other.sketch.update(values)
+        self.merge(other)
+
+    def merge(self, other):
+        n = self.n + other.n
+        if n:
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta ** 2 * self.n * other.n / n
+            self.mean += delta * other.n / n
+        self.n = n
+        self.n_missing += other.n_missing
+        self.col_min = np.fmin(self.col_min, other.col_min)
+        self.col_max = np.fmax(self.col_max, other.col_max)
+        self.n_zeros += other.n_zeros
+        self.n_negatives += other.n_negatives
+        self.sketch.merge(other.sketch)
+
+    def result(self):
+        return {
+            'n_missing': self.n_missing,
+            'col_mean': self.mean if self.n else np.nan,
+            'col_std': np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.nan,
+            'col_min': self.col_min,
+            'col_max': self.col_max,
+            'n_zeros': self.n_zeros,
+            'n_negatives': self.n_negatives,
+            'n_unique': self.sketch.distinct.estimate(),
+            'col_median': self.sketch.quantile_sketch.quantile(0.5),
+        }
+
+
+class TextAccumulator:
+    """
+    --------------------
+    Description
+    --------------------
+    -> TextAccumulator (class): Mergeable accumulator of the counts of a text column read in chunks (missing, empty, whitespace-only, lowercase, uppercase, alphabetic and digit-only values).
+        Missing values are filled with '' as in memory (tab_df.profiler.to_text), so they are also counted as empty values.
+        The most frequent values are estimated with a mergeable heavy hitters summary (tab_text.heavy_hitters.MisraGries), the number of unique values with a HyperLogLog and the string length percentiles with a KLLSketch (tab_num.sketches).
+
+    """
+    COUNTS = ['n_missing', 'n_empty', 'n_space', 'n_lower', 'n_upper', 'n_alpha', 'n_digit']
+
+    def __init__(self):
+        self.counts = dict.fromkeys(self.COUNTS, 0)
+        self.heavy_hitters = MisraGries()
+        self.distinct = HyperLogLog()
+        self.lengths = KLLSketch()
+        self.len_min = np.nan
+        self.len_max = np.nan
+        self.len_sum = 0
+
+    def update(self, serie):
+        text = to_text(serie)
+        counts, lengths = classify_text(text)
+        other = TextAccumulator()
+        other.counts = dict(counts, n_missing=int(serie.isna().sum()))
+        other.heavy_hitters.update(text)
+        other.distinct.update(text.to_numpy(dtype=object))
+        other.lengths.update(lengths)
+        if len(lengths):
+            other.len_min = int(lengths.min())
+            other.len_max = int(lengths.max())
+            other.len_sum = int(lengths.sum())
+        self.merge(other)
+
+    def merge(self, other):
+        for name in self.COUNTS:
+            self.counts[name] += other.counts[name]
+        self.heavy_hitters.merge(other.heavy_hitters)
+        self.distinct.merge(other.distinct)
+        self.lengths.merge(other.lengths)
+        self.len_min = np.fmin(self.len_min, other.len_min)
+        self.len_max = np.fmax(self.len_max, other.len_max)
+        self.len_sum += other.len_sum
+
+    def result(self):
+        top = self.heavy_hitters.top(1)
+        n = self.lengths.n
+        percentiles = self.lengths.quantiles([p / 100 for p in LENGTH_PERCENTILES])
+        return dict(
+            self.counts,
+            n_unique=self.distinct.estimate(),
+            n_mode=top.index[0] if not top.empty else None,
+            max_error=self.heavy_hitters.max_error,
+            len_min=self.len_min,
+            len_mean=self.len_sum / n if n else np.nan,
+            len_max=self.len_max,
+            **{f'len_p{p}': value for p, value in zip(LENGTH_PERCENTILES, percentiles)}
+        )
+
+
+class DateAccumulator:
+    """
+    --------------------
+    Description
+    --------------------
+    -> DateAccumulator (class): Mergeable accumulator of the statistics of a date column read in chunks (missing values, minimum, maximum, weekend, weekday, future, 1900-01-01 and 1970-01-01 dates).
+        The number of unique dates is estimated with a HyperLogLog (tab_num.sketches).
+
+    """
+    def __init__(self):
+        self.n_missing = 0
+        self.col_min = pd.NaT
+        self.col_max = pd.NaT
+        self.n_weekend = 0
+        self.n_weekday = 0
+        self.n_future = 0
+        self.n_empty_1900 = 0
+        self.n_empty_1970 = 0
+        self.distinct = HyperLogLog()
+
+    def update(self, serie):
+        dates = pd.to_datetime(serie, errors='coerce')
+        other = DateAccumulator()
+        other.n_missing = int(dates.isna().sum())
+        dates = dates.dropna()
+        if len(dates):
+            weekdays = dates.dt.weekday
+            other.col_min = dates.min()
+            other.col_max = dates.max()
+            other.n_weekend = int((weekdays > 4).sum())
+            other.n_weekday = int((weekdays < 5).sum())
+            other.n_future = int((dates > datetime.now()).sum())
+            other.n_empty_1900 = int((dates == pd.Timestamp('1900-01-01')).sum())
+            other.n_empty_1970 = int((dates == pd.Timestamp('1970-01-01')).sum())
+            # dates are hashed as their integer timestamps
+            other.distinct.update(dates.to_numpy(dtype='datetime64[ns]').view(np.int64))
+        self.merge(other)
+
+    def merge(self, other):
+        self.n_missing += other.n_missing
+        self.col_min = min((d for d in (self.col_min, other.col_min) if not pd.isna(d)), default=pd.NaT)
+        self.col_max = max((d for d in (self.col_max, other.col_max) if not pd.isna(d)), default=pd.NaT)
+        self.n_weekend += other.n_weekend
+        self.n_weekday += other.n_weekday
+        self.n_future += other.n_future
+        self.n_empty_1900 += other.n_empty_1900
+        self.n_empty_1970 += other.n_empty_1970
+        self.distinct.merge(other.distinct)
+
+    def result(self):
+        return {
+            'n_unique': self.distinct.estimate(),
+            'n_missing': self.n_missing,
+            'col_min': self.col_min,
+            'col_max': self.col_max,
+            'n_weekend': self.n_weekend,
+            'n_weekday': self.n_weekday,
+            'n_future': self.n_future,
+            'n_empty_1900': self.n_empty_1900,
+            'n_empty_1970': self.n_empty_1970,
+        }
+
+
+class StreamingProfile:
+    """
+    --------------------
+    Description
+    --------------------
+    -> StreamingProfile (class): Class that profiles a CSV chunk by chunk, so that files larger than memory can be summarized without building the full DataFrame.
+        The kind of each column (numeric, text or date) is decided from the values of every chunk: numbers from the data type and dates by parsing the text values.
+        A column whose later chunks hold values of another kind is promoted to text (like pd.read_csv reads mixed columns as objects), and as the earlier chunks were folded into an accumulator of the wrong kind, read_csv() then reads the file a second time with the final kinds.
+        Every chunk is folded into the column's mergeable accumulator.
+        The accumulated statistics are read by the column tabs through the same methods as tab_df.profiler.Profiler (numeric(), text(), text_counts() and date()).
+        As the unique counts, quantiles and most frequent values are estimates, the tabs use them in their sketch and heavy hitters modes and compute exact statistics from the loaded column otherwise.
+
+    --------------------
+    Attributes
+    --------------------
+    -> n_rows (int): Number of rows read
+    -> n_missing (int): Number of missing cells
+    -> duplicates (DuplicateDetector): Detector of the duplicated rows, updated chunk by chunk (None when duplicates are not counted)
+    -> dtypes (dict): Data type of each column, combined over the chunks
+    -> kinds (dict): Kind of each column ('numeric', 'text' or 'date', None while only missing values were seen)
+    -> accumulators (dict): Accumulator of each column
+    -> memory (dict): Memory usage of each column summed over the chunks
+    -> head (pd.DataFrame): First rows of the file
+    -> tail (pd.DataFrame): Last rows of the file
+    -> sample (pd.DataFrame): Uniform random sample of rows (reservoir sampling)
+
+    """
+    # the statistics are estimated (tab_df.profiler.Profiler computes exact ones)
+    approximate = True
+
+    def __init__(self, preview_rows=PREVIEW_ROWS, seed=0, duplicates='approximate'):
+        self.preview_rows = preview_rows
+        self.seed = seed
+        self.duplicates_mode = duplicates
+        self.reset()
+
+    def reset(self, kinds=None):
+        # kinds are given when the file is read again after a column was promoted, they are then kept as is
+        self.rng = np.random.default_rng(self.seed)
+        self.n_rows = 0
+        self.n_missing = 0
+        self.duplicates = DuplicateDetector(mode=self.duplicates_mode) if self.duplicates_mode else None
+        self.dtypes = {}
+        self.kinds = dict(kinds) if kinds is not None else {}
+        self.fixed_kinds = kinds is not None
+        # whether a column changed kind after its first chunk, its accumulator then missing the earlier values
+        self.promoted = False
+        self.accumulators = {}
+        self.memory = {}
+        self.head = None
+        self.tail = None
+        self.sample = None
+        self._tail_chunks = deque()
+
+    def set_kind(self, col, kind):
+        self.kinds[col] = kind
+        # columns holding only missing values so far are read as float64 by pd.read_csv, so they are summarized as numbers until other values are seen
+        if kind in ('numeric', None):
+            self.accumulators[col] = NumericAccumulator()
+        elif kind == 'date':
+            self.accumulators[col] = DateAccumulator()
+        else:
+            self.accumulators[col] = TextAccumulator()
+
+    def set_dtype(self, col, dtype):
+        if col not in self.dtypes or self.dtypes[col] == dtype:
+            self.dtypes[col] = dtype
+        elif pd.api.types.is_numeric_dtype(self.dtypes[col]) and pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype) and not pd.api.types.is_bool_dtype(self.dtypes[col]):
+            # e.g. int64 then float64 once a value is missing
+            self.dtypes[col] = np.result_type(self.dtypes[col], dtype)
+        else:
+            self.dtypes[col] = np.dtype(object)
+
+    def update(self, chunk):
+        first_chunk = self.head is None
+        if first_chunk:
+            self.head = chunk.head(self.preview_rows)
+            for col in chunk.columns:
+                self.memory[col] = 0
+                if self.fixed_kinds:
+                    self.set_kind(col, self.kinds[col])
+        self.n_rows += len(chunk)
+        self.n_missing += int(chunk.isnull().sum().sum())
+        for col, usage in chunk.memory_usage(deep=True, index=False).items():
+            self.memory[col] += int(usage)
+        for col in chunk.columns:
+            self.set_dtype(col, chunk[col].dtype)
+            if self.fixed_kinds:
+                kind = self.kinds[col]
+                dates = parse_dates(chunk[col]) if kind == 'date' else None
+            else:
+                observed, dates = observed_kind(chunk[col])
+                kind = combine_kinds(self.kinds.get(col), observed)
+                if first_chunk or kind != self.kinds[col]:
+                    self.promoted = self.promoted or not first_chunk
+                    self.set_kind(col, kind)
+            # dates parsed while classifying the column are not parsed again
+            self.accumulators[col].update(dates if dates is not None else chunk[col])
+        if self.duplicates is not None:
+            self.duplicates.update(chunk)
+        self.update_previews(chunk)
+
+    def update_previews(self, chunk):
+        # keep just enough chunks to build the tail
+        self._tail_chunks.append(chunk.tail(self.preview_rows))
+        while sum(len(c) for c in self._tail_chunks) - len(self._tail_chunks[0]) >= self.preview_rows:
+            self._tail_chunks.popleft()
+        self.tail = pd.concat(self._tail_chunks).tail(self.preview_rows)
+        # reservoir sampling: each row read so far has the same probability of being in the sample
+        seen_before = self.n_rows - len(chunk)
+        if self.sample is None:
+            self.sample = chunk.iloc[:0]
+        start = min(max(self.preview_rows - len(self.sample), 0), len(chunk))
+        if start:
+            self.sample = pd.concat([self.sample, chunk.iloc[:start]])
+        positions = np.arange(start, len(chunk))
+        slots = (self.rng.random(len(positions)) * (positions + seen_before + 1)).astype(np.int64)
+        replace = slots < self.preview_rows
+        if replace.any():
+            # a slot picked twice in the same chunk keeps the last row, as in the row by row algorithm
+            picked = pd.Series(positions[replace], index=slots[replace])
+            picked = picked[~picked.index.duplicated(keep='last')]
+            kept = np.setdiff1d(np.arange(len(self.sample)), picked.index.to_numpy())
+            self.sample = pd.concat([self.sample.iloc[kept], chunk.iloc[picked.to_numpy()]]).sort_index()
+
+    def read_csv(self, file_path, chunksize=CHUNK_SIZE):
+        self.read_chunks(file_path, chunksize)
+        if self.promoted:
+            # the earlier chunks of a promoted column are folded again into an accumulator of its final kind
+            self.reset(kinds=self.kinds)
+            self.read_chunks(file_path, chunksize)
+        # columns without any value are read as float64 by pd.read_csv
+        self.kinds = {col: 'numeric' if kind is None else kind for col, kind in self.kinds.items()}
+        return self
+
+    def read_chunks(self, file_path, chunksize):
+        # uploaded files are read from the start on every pass
+        if hasattr(file_path, 'seek'):
+            file_path.seek(0)
+        for chunk in pd.read_csv(file_path, chunksize=chunksize):
+            self.update(chunk)
+
+    def n_cols_of(self, kind):
+        return sum(1 for k in self.kinds.values() if k == kind)
+
+    def numeric(self, col_name, sketch=False):
+        """
+        --------------------
+        Description
+        --------------------
+        -> numeric (method): Class method that returns the accumulated statistics of a numeric column, in sketch mode only (its unique count and quantiles are sketch estimates)
+
+        --------------------
+        Parameters
+        --------------------
+        -> col_name (str): Name of the column
+        -> sketch (bool): Whether the statistics are requested in sketch mode
+
+        --------------------
+        Returns
+        --------------------
+        -> (dict): Same statistics as tab_df.profiler.Profiler.numeric() with sketch=True, or None when they are not available
+
+        """
+        accumulator = self.accumulators.get(col_name)
+        if not sketch or not isinstance(accumulator, NumericAccumulator):
+            return None
+        return dict(accumulator.result(), quantiles=accumulator.sketch.result()['quantiles'])
+
+    def text(self, col_name):
+        """
+        --------------------
+        Description
+        --------------------
+        -> text (method): Class method that returns the accumulated statistics of a text column
+
+        --------------------
+        Parameters
+        --------------------
+        -> col_name (str): Name of the column
+
+        --------------------
+        Returns
+        --------------------
+        -> (dict): Same statistics as tab_df.profiler.Profiler.text(), plus the max_error of the heavy hitters counts, or None when the column was not read as text
+
+        """
+        accumulator = self.accumulators.get(col_name)
+        return accumulator.result() if isinstance(accumulator, TextAccumulator) else None
+
+    def text_counts(self, col_name):
+        """
+        --------------------
+        Description
+        --------------------
+        -> text_counts (method): Class method that returns the estimated number of occurrences of the most frequent values of a text column (never overestimated, see tab_text.heavy_hitters.MisraGries)
+
+        --------------------
+        Parameters
+        --------------------
+        -> col_name (str): Name of the column
+
+        --------------------
+        Returns
+        --------------------
+        -> (pd.Series): Occurrences of each value, most frequent first, or None when the column was not read as text
+
+        """
+        accumulator = self.accumulators.get(col_name)
+        return accumulator.heavy_hitters.top() if isinstance(accumulator, TextAccumulator) else None
+
+    def date(self, col_name, series):
+        """
+        --------------------
+        Description
+        --------------------
+        -> date (method): Class method that returns the accumulated statistics of a date column, or the statistics of the loaded column when it was not read as dates while streaming
+
+        --------------------
+        Parameters
+        --------------------
+        -> col_name (str): Name of the column
+        -> series (pd.Series): Column converted to datetime
+
+        --------------------
+        Returns
+        --------------------
+        -> (dict): n_unique (estimate), n_missing, col_min, col_max, n_weekend, n_weekday, n_future, n_empty_1900 and n_empty_1970
+
+        """
+        accumulator = self.accumulators.get(col_name)
+        if isinstance(accumulator, DateAccumulator):
+            return accumulator.result()
+        return date_stats(series)
+
+    def column_summary(self):
+        """
+        --------------------
+        Description
+        --------------------
+        -> column_summary (method): Class method that formats the statistics of every column as a Pandas dataframe with one row per column
+
+        --------------------
+        Parameters
+        --------------------
+        -> None
+
+        --------------------
+        Returns
+        --------------------
+        -> (pd.DataFrame): Column name, kind and statistics of each column
+
+        """
+        rows = [dict(column=col, kind=self.kinds[col], **accumulator.result()) for col, accumulator in self.accumulators.items()]
+        return pd.DataFrame(rows)
@@ -1,20 +1,33 @@
 import streamlit as st
-from tab_num.logics import NumericColumn  # Import the NumericColumn class
+from tab_num.logics import BIN_RULES, NumericColumn  # Import the NumericColumn class
 
-def display_tab_num_content(df):
+# Columns longer than this use the sketches by default
+SKETCH_ROWS = 10_000_000
+
+def display_tab_num_content(df, profiler=None, dataset=None):
     # Ensure num_column is an instance of NumericColumn and initialized with the DataFrame
     if "num_column" not in st.session_state or st.session_state.num_column is None:
-        st.session_state.num_column = NumericColumn(df=df)
+        st.session_state.num_column = NumericColumn(df=df, profiler=profiler, dataset=dataset)
 
     # Set up the numeric column instance to find and use a specific numeric column
     num_column = st.session_state.num_column
 
+    # Use bounded-memory sketches instead of exact unique counts and medians (on by default for very long columns and in streaming mode, where they were filled while reading the file)
+    streaming = dataset is not None and dataset.streaming
+    num_column.sketch = st.checkbox(
+        "Estimate unique values and quantiles with sketches (faster on very large columns)",
+        value=streaming or (dataset.n_rows if dataset is not None else len(df)) > SKETCH_ROWS,
+    )
+
     # Find all numeric columns
     num_column.find_num_cols()
 
     # Dropdown to select a numeric column for exploration
     selected_column = st.selectbox("Select a numeric column to explore", num_column.cols_list)
 
+    # Rule used to compute the histogram bins on the server
+    num_column.bin_rule = st.radio("Histogram bins", options=list(BIN_RULES), format_func=BIN_RULES.get, horizontal=True)
+
     # Set data for the selected column and calculate relevant statistics
     num_column.set_data(selected_column)
 
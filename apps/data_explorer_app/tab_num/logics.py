@@ -1,6 +1,13 @@
+import numpy as np
 import pandas as pd
 import altair as alt
 
+from tab_num.sketches import NumericSketch
+
+# binning rules of the histogram and maximum number of bins
+BIN_RULES = {"fd": "Freedman–Diaconis", "sturges": "Sturges", "log": "Log-scaled"}
+MAX_BINS = 200
+
 class NumericColumn:
     """
     --------------------
@@ -23,10 +30,16 @@ class NumericColumn:
     -> n_zeros (int): Number of times a series has values equal to 0 (default set to None)
     -> n_negatives (int): Number of times a series has negative values (default set to None)
     -> histogram (alt.Chart): Altair histogram displaying the count for each bin value of a series (default set to empty)
+    -> bin_rule (str): Binning rule of the histogram, one of the keys of BIN_RULES (default set to 'fd')
+    -> bins (pd.DataFrame): DataFrame with the bin_start, bin_end and count of each bin of the histogram (default set to empty)
     -> frequent (pd.DataFrame): DataFrame containing the most frequent value of a series (default set to empty)
+    -> profiler (tab_df.profiler.Profiler): Profiler of the dataframe, whose cached statistics replace the separate scans (default set to None)
+    -> sketch (bool): Whether to estimate the number of unique values and the quantiles with bounded-memory sketches (HyperLogLog and KLL, see tab_num.sketches) instead of exact scans (default set to False)
+    -> quantiles (dict): Estimated 5th, 25th, 75th and 95th percentiles of a series when sketch is True (default set to empty)
+    -> dataset (tab_df.logics.Dataset): Dataset through which the selected column is read, so that only that column is loaded when the full DataFrame is not in memory; df is then only used to find the numeric columns (default set to None)
     """
 
-    def __init__(self, file_path=None, df=None):
+    def __init__(self, file_path=None, df=None, profiler=None, sketch=False, dataset=None):
         # Only load from file_path if it's a non-empty string and ignore if df is provided directly
         if file_path is not None and isinstance(file_path, str):
             self.df = pd.read_csv(file_path)
@@ -36,6 +49,11 @@ class NumericColumn:
             raise ValueError("Either a valid file_path or a DataFrame must be provided.")
 
         # Initialize other attributes, such as numeric columns
+        self.dataset = dataset
+        self.profiler = profiler
+        self.sketch = sketch
+        self.quantiles = {}
+        self.numeric_sketch = None
         self.cols_list = []
         self.serie = None
         self.n_unique = None
@@ -48,6 +66,8 @@ class NumericColumn:
         self.n_zeros = None
         self.n_negatives = None
         self.histogram = alt.Chart()
+        self.bin_rule = "fd"
+        self.bins = pd.DataFrame(columns=['bin_start', 'bin_end', 'count'])
         self.frequent = pd.DataFrame(columns=['value', 'occurrence', 'percentage'])
 
 
@@ -63,8 +83,19 @@ class NumericColumn:
         Set the series attribute to the selected numeric column and compute relevant statistics.
         """
         if self.df is not None and col_name in self.df.columns:
-            self.serie = self.df[col_name]
+            self.serie = self.get_column(col_name)
             self.convert_serie_to_num()
+            # quantiles are only estimated in sketch mode, drop those of a previous column or mode
+            self.quantiles = {}
+            # statistics computed in a single pass over the column and kept by the profiler (the streaming profile only has sketch estimates)
+            stats = self.profiler.numeric(col_name, sketch=self.sketch) if self.profiler is not None else None
+            if stats is not None:
+                for name, value in stats.items():
+                    setattr(self, name, value)
+                self.set_histogram()
+                self.set_frequent()
+                return
+            self.set_sketch()
             self.set_unique()
             self.set_missing()
             self.set_mean()
@@ -77,6 +108,14 @@ class NumericColumn:
             self.set_histogram()
             self.set_frequent()
 
+    def get_column(self, col_name):
+        """
+        Return the selected column, read through the Dataset when one is given.
+        """
+        if self.dataset is not None:
+            return self.dataset.read_columns([col_name])[col_name]
+        return self.df[col_name]
+
     def convert_serie_to_num(self):
         """
         Convert the series to numeric values, coercing errors to NaN.
@@ -90,9 +129,22 @@ class NumericColumn:
         """
         return self.serie is None or self.serie.empty
 
+    def set_sketch(self):
+        """
+        Fill the HyperLogLog and KLL sketches of the series when sketch mode is on, and estimate its quantiles.
+        """
+        self.numeric_sketch = None
+        if self.sketch and not self.is_serie_none():
+            self.numeric_sketch = NumericSketch()
+            self.numeric_sketch.update(self.serie.to_numpy(dtype='float64', na_value=float('nan')))
+            self.quantiles = self.numeric_sketch.result()['quantiles']
+
     def set_unique(self):
         if not self.is_serie_none():
-            self.n_unique = self.serie.nunique()
+            if self.numeric_sketch is not None:
+                self.n_unique = self.numeric_sketch.distinct.estimate()
+            else:
+                self.n_unique = self.serie.nunique()
 
     def set_missing(self):
         if not self.is_serie_none():
@@ -124,16 +176,57 @@ class NumericColumn:
 
     def set_median(self):
         if not self.is_serie_none():
-            self.col_median = self.serie.median()
+            if self.numeric_sketch is not None:
+                self.col_median = self.numeric_sketch.quantile_sketch.quantile(0.5)
+            else:
+                self.col_median = self.serie.median()
+
+    def set_bins(self):
+        """
+        Count the values of the series in bins computed with NumPy, using the rule in bin_rule:
+        Freedman–Diaconis (bin width 2 * IQR / n^(1/3)), Sturges (log2(n) + 1 bins) or log-scaled bins for heavy tails
+        (geometric bins over the positive values, non-positive values being counted in a first bin). At most MAX_BINS bins are used.
+        """
+        values = self.serie.to_numpy(dtype='float64', na_value=np.nan)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            self.bins = pd.DataFrame(columns=['bin_start', 'bin_end', 'count'])
+            return
+        low, high = values.min(), values.max()
+        positives = values[values > 0]
+        if self.bin_rule == "log" and len(positives) and positives.min() < high:
+            n_bins = min(int(np.ceil(np.log2(len(values)))) + 1, MAX_BINS)
+            edges = np.geomspace(positives.min(), high, n_bins + 1)
+            if low <= 0:
+                edges = np.concatenate([[low], edges])
+        else:
+            if self.bin_rule == "fd":
+                # reuse the sketch quantiles when they have been estimated
+                if 0.25 in self.quantiles and 0.75 in self.quantiles:
+                    q1, q3 = self.quantiles[0.25], self.quantiles[0.75]
+                else:
+                    q1, q3 = np.percentile(values, [25, 75])
+                width = 2 * (q3 - q1) / len(values) ** (1 / 3)
+                n_bins = int(np.ceil((high - low) / width)) if width > 0 else 1
+            else:
+                n_bins = int(np.ceil(np.log2(len(values)))) + 1
+            edges = np.histogram_bin_edges(values, bins=max(min(n_bins, MAX_BINS), 1), range=(low, high))
+        counts, edges = np.histogram(values, bins=edges)
+        self.bins = pd.DataFrame({'bin_start': edges[:-1], 'bin_end': edges[1:], 'count': counts})
 
     def set_histogram(self):
         """
         Create an Altair histogram for the numeric series if it's valid.
+        Only the pre-aggregated bins are sent to the browser, not the whole DataFrame.
         """
         if not self.is_serie_none():
-            self.histogram = alt.Chart(self.df).mark_bar().encode(
-                alt.X(f"{self.serie.name}:Q", bin=True),
-                y='count()'
+            self.set_bins()
+            scale = alt.Scale(type='symlog') if self.bin_rule == "log" else alt.Scale()
+            self.histogram = alt.Chart(self.bins).mark_bar().encode(
+                alt.X('bin_start:Q', bin='binned', title=str(self.serie.name), scale=scale),
+                x2='bin_end:Q',
+                y=alt.Y('count:Q', title='Count'),
+                tooltip=['bin_start:Q', 'bin_end:Q', 'count:Q']
             ).properties(
                 width=600,
                 height=400
@@ -178,5 +271,12 @@ class NumericColumn:
                     self.col_median
                 ]
             }
+            if self.sketch:
+                # label the sketch estimates and add the other estimated quantiles
+                summary["Description"][0] = "Number of Unique Values (estimate, ±1.6%)"
+                summary["Description"][8] = "Median Value (estimate, ±1.65% rank)"
+                for q, value in self.quantiles.items():
+                    summary["Description"].append(f"{int(q * 100)}th Percentile (estimate, ±1.65% rank)")
+                    summary["Value"].append(value)
             return pd.DataFrame(summary)
         return pd.DataFrame(columns=["Description", "Value"])
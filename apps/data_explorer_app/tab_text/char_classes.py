@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# bit of each character class in the lookup table of bytes (NON_ASCII marks the bytes of multi-byte UTF-8 characters)
+SPACE, LOWER, UPPER, ALPHA, DIGIT, NON_ASCII = 1, 2, 4, 8, 16, 32
+# percentiles of the string lengths reported next to the minimum, mean and maximum
+LENGTH_PERCENTILES = [25, 50, 75, 95]
+
+
+def _ascii_table():
+    table = np.zeros(256, dtype=np.uint8)
+    # same whitespace characters as str.isspace() in the ASCII range
+    for char in ' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f':
+        table[ord(char)] |= SPACE
+    table[ord('a'):ord('z') + 1] |= LOWER | ALPHA
+    table[ord('A'):ord('Z') + 1] |= UPPER | ALPHA
+    table[ord('0'):ord('9') + 1] |= DIGIT
+    table[0x80:] |= NON_ASCII
+    return table
+
+
+ASCII_TABLE = _ascii_table()
+
+
+def utf8_buffers(values):
+    """
+    --------------------
+    Description
+    --------------------
+    -> utf8_buffers (function): Function that returns the UTF-8 bytes of all the strings of a Pandas Series, concatenated, and the offsets of each string in them.
+        Arrow builds them in C when pyarrow is installed, otherwise they are built from the joined string.
+
+    --------------------
+    Parameters
+    --------------------
+    -> values (pd.Series): Strings without missing values
+
+    --------------------
+    Returns
+    --------------------
+    -> (np.ndarray): UTF-8 bytes of the strings
+    -> (np.ndarray): Offset of each string in the bytes, followed by the total number of bytes
+
+    """
+    if pa is not None:
+        array = pa.array(values.to_numpy(dtype=object), type=pa.large_string())
+        _, offsets, data = array.buffers()
+        offsets = np.frombuffer(offsets, dtype=np.int64, count=len(array) + 1, offset=array.offset * 8)
+        data = np.frombuffer(data, dtype=np.uint8) if data is not None else np.zeros(0, dtype=np.uint8)
+        return data, offsets - offsets[0]
+    joined = ''.join(values)
+    data = np.frombuffer(joined.encode('utf-8'), dtype=np.uint8)
+    if len(data) == len(joined):
+        # only ASCII characters: one byte per character
+        lengths = values.str.len().to_numpy(dtype=np.int64)
+    else:
+        lengths = np.fromiter((len(value.encode('utf-8')) for value in values), dtype=np.int64, count=len(values))
+    return data, np.concatenate([[0], np.cumsum(lengths)])
+
+
+def classify_text(values):
+    """
+    --------------------
+    Description
+    --------------------
+    -> classify_text (function): Function that classifies every character of a series of strings once and counts, in the same pass, the empty values and the values that are only whitespace, lowercase, uppercase, alphabetic or digits (same results as the str.isspace/islower/isupper/isalpha/isdigit methods).
+        Strings holding non-ASCII characters are rare in most columns and are classified with the str methods.
+
+    --------------------
+    Parameters
+    --------------------
+    -> values (pd.Series): Strings without missing values
+
+    --------------------
+    Returns
+    --------------------
+    -> (dict): n_empty, n_space, n_lower, n_upper, n_alpha and n_digit counts
+    -> (np.ndarray): Length of each string in characters, taken from the offsets of the buffer
+
+    """
+    data, offsets = utf8_buffers(values)
+    byte_lengths = np.diff(offsets)
+    classes = np.take(ASCII_TABLE, data)
+    non_empty = byte_lengths > 0
+    starts = offsets[:-1][non_empty]
+
+    # the segments of the non-empty strings are contiguous, so one OR and one AND reduction give the classes found in each string
+    # and the classes shared by all its characters
+    any_class = np.zeros(len(byte_lengths), dtype=np.uint8)
+    all_class = np.zeros(len(byte_lengths), dtype=np.uint8)
+    if len(starts):
+        any_class[non_empty] = np.bitwise_or.reduceat(classes, starts)
+        all_class[non_empty] = np.bitwise_and.reduceat(classes, starts)
+
+    non_ascii = (any_class & NON_ASCII) > 0
+    ascii_only = non_empty & ~non_ascii
+    is_space = ascii_only & ((all_class & SPACE) > 0)
+    is_lower = ascii_only & ((any_class & LOWER) > 0) & ((any_class & UPPER) == 0)
+    is_upper = ascii_only & ((any_class & UPPER) > 0) & ((any_class & LOWER) == 0)
+    is_alpha = ascii_only & ((all_class & ALPHA) > 0)
+    is_digit = ascii_only & ((all_class & DIGIT) > 0)
+
+    lengths = byte_lengths
+    if non_ascii.any():
+        # characters are the bytes that do not continue a multi-byte UTF-8 sequence
+        continuation = ((data & 0xC0) == 0x80).view(np.uint8)
+        lengths = byte_lengths.copy()
+        lengths[non_empty] -= np.add.reduceat(continuation, starts, dtype=np.int64)
+
+    counts = {
+        'n_empty': int((~non_empty).sum()),
+        'n_space': int(is_space.sum()),
+        'n_lower': int(is_lower.sum()),
+        'n_upper': int(is_upper.sum()),
+        'n_alpha': int(is_alpha.sum()),
+        'n_digit': int(is_digit.sum()),
+    }
+    others = np.flatnonzero(non_ascii)
+    if len(others):
+        text = pd.Series(values.to_numpy(dtype=object)[others]).str
+        for name, method in [('n_space', text.isspace), ('n_lower', text.islower), ('n_upper', text.isupper),
+                             ('n_alpha', text.isalpha), ('n_digit', text.isdigit)]:
+            counts[name] += int(method().sum())
+    return counts, lengths
+
+
+def profile_text(values):
+    """
+    --------------------
+    Description
+    --------------------
+    -> profile_text (function): Function that counts the character classes of a series of strings with classify_text() and adds statistics on the length of the strings
+
+    --------------------
+    Parameters
+    --------------------
+    -> values (pd.Series): Strings without missing values
+
+    --------------------
+    Returns
+    --------------------
+    -> (dict): n_empty, n_space, n_lower, n_upper, n_alpha and n_digit counts, and len_min, len_mean, len_max and len_p25/len_p50/len_p75/len_p95 statistics
+
+    """
+    counts, lengths = classify_text(values)
+    if len(lengths):
+        percentiles = np.percentile(lengths, LENGTH_PERCENTILES)
+        counts.update(len_min=int(lengths.min()), len_mean=float(lengths.mean()), len_max=int(lengths.max()))
+    else:
+        percentiles = np.full(len(LENGTH_PERCENTILES), np.nan)
+        counts.update(len_min=np.nan, len_mean=np.nan, len_max=np.nan)
+    counts.update({f'len_p{p}': value for p, value in zip(LENGTH_PERCENTILES, percentiles)})
+    return counts
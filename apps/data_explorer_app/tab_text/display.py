@@ -1,9 +1,9 @@
 import streamlit as st
 from tab_text.logics import TextColumn
 
-def display_tab_text_content(file_path=None, df=None):
+def display_tab_text_content(file_path=None, df=None, profiler=None, dataset=None):
     if "text_column_instance" not in st.session_state:
-        st.session_state["text_column_instance"] = TextColumn(file_path=file_path, df=df)
+        st.session_state["text_column_instance"] = TextColumn(file_path=file_path, df=df, profiler=profiler, dataset=dataset)
     
     text_column = st.session_state["text_column_instance"]
     text_column.find_text_cols()
@@ -13,6 +13,11 @@ def display_tab_text_content(file_path=None, df=None):
         return
     
     selected_column = st.selectbox("Select a text column to explore", text_column.cols_list)
+    # in streaming mode the summary was filled while reading the file, so it is used by default
+    text_column.heavy_hitters = st.checkbox(
+        "Approximate the most frequent values with a bounded-memory summary (for columns with millions of distinct values)",
+        value=dataset is not None and dataset.streaming,
+    )
     
     if selected_column:
         text_column.set_data(selected_column)
@@ -0,0 +1,108 @@
+import pandas as pd
+
+# number of counters kept by the heavy hitters summary
+HEAVY_HITTERS_CAPACITY = 1000
+
+
+class MisraGries:
+    """
+    --------------------
+    Description
+    --------------------
+    -> MisraGries (class): Bounded-memory summary of the most frequent values of a column read in chunks (mergeable Misra-Gries summary).
+        At most capacity counters are kept. Each chunk is counted exactly, added to the counters, and when more than capacity values are tracked the (capacity + 1)-th largest count is subtracted from every counter and the counters at zero are dropped.
+        Counts are never over-estimated and are under-estimated by at most max_error <= n / (capacity + 1), where n is the number of values added, so every value more frequent than n / (capacity + 1) is guaranteed to be kept.
+
+    --------------------
+    Attributes
+    --------------------
+    -> capacity (int): Maximum number of counters kept
+    -> counters (pd.Series): Estimated count of each tracked value
+    -> n (int): Number of values added
+    -> max_error (int): Maximum under-estimation of the counts
+
+    """
+
+    def __init__(self, capacity=HEAVY_HITTERS_CAPACITY):
+        self.capacity = capacity
+        self.counters = pd.Series(dtype='int64')
+        self.n = 0
+        self.max_error = 0
+
+    def update(self, values):
+        """
+        --------------------
+        Description
+        --------------------
+        -> update (method): Class method that adds the values of a chunk to the summary
+
+        --------------------
+        Parameters
+        --------------------
+        -> values (pd.Series): Values of the chunk
+
+        --------------------
+        Returns
+        --------------------
+        -> None
+
+        """
+        self.n += len(values)
+        self.add(values.value_counts())
+
+    def merge(self, other):
+        """
+        --------------------
+        Description
+        --------------------
+        -> merge (method): Class method that merges another summary into this one
+
+        --------------------
+        Parameters
+        --------------------
+        -> other (MisraGries): Summary of other values
+
+        --------------------
+        Returns
+        --------------------
+        -> (MisraGries): This summary
+
+        """
+        self.n += other.n
+        self.max_error += other.max_error
+        self.add(other.counters)
+        return self
+
+    def add(self, counts):
+        # reducing the chunk first keeps the union small, the two reductions together still undercount by at most n / (capacity + 1)
+        counts = self.reduce(counts)
+        self.counters = self.reduce(self.counters.add(counts, fill_value=0).astype('int64'))
+
+    def reduce(self, counters):
+        if len(counters) <= self.capacity:
+            return counters
+        threshold = int(counters.nlargest(self.capacity + 1).iloc[-1])
+        self.max_error += threshold
+        counters = counters - threshold
+        return counters[counters > 0]
+
+    def top(self, k=None):
+        """
+        --------------------
+        Description
+        --------------------
+        -> top (method): Class method that returns the estimated counts of the k most frequent values, largest first
+
+        --------------------
+        Parameters
+        --------------------
+        -> k (int): Number of values returned (defaults to None for all the tracked values)
+
+        --------------------
+        Returns
+        --------------------
+        -> (pd.Series): Estimated count of each value
+
+        """
+        top = self.counters.sort_values(ascending=False, kind='stable')
+        return top if k is None else top.head(k)
@@ -1,10 +1,28 @@
 import pandas as pd
 import altair as alt
 
+from tab_text.char_classes import LENGTH_PERCENTILES, profile_text
+from tab_num.sketches import HyperLogLog
+from tab_text.heavy_hitters import MisraGries
+
+# number of values drawn in the bar chart, the others are grouped in a single "Other" bar
+TOP_K = 30
+# number of rows added at a time to the heavy hitters summary
+CHUNK_SIZE = 200_000
+
 class TextColumn:
-    def __init__(self, file_path=None, df=None):
+    def __init__(self, file_path=None, df=None, profiler=None, heavy_hitters=False, top_k=TOP_K, dataset=None):
         self.file_path = file_path
         self.df = pd.read_csv(file_path) if file_path else df
+        # when given, the selected column is read through the Dataset and df is only used to find the text columns
+        self.dataset = dataset
+        self.profiler = profiler
+        # approximate the counts with a bounded-memory summary read chunk by chunk
+        self.heavy_hitters = heavy_hitters
+        self.top_k = top_k
+        self.value_counts = None
+        self.max_error = 0
+        self.distinct = None
         self.cols_list = []
         self.serie = None
         self.n_unique = None
@@ -16,70 +34,111 @@ class TextColumn:
         self.n_upper = None
         self.n_alpha = None
         self.n_digit = None
+        self.len_min = None
+        self.len_mean = None
+        self.len_max = None
+        for p in LENGTH_PERCENTILES:
+            setattr(self, f'len_p{p}', None)
         self.barchart = alt.Chart()
         self.frequent = pd.DataFrame(columns=['value', 'occurrence', 'percentage'])
 
     def find_text_cols(self):
-        self.cols_list = [col for col in self.df.columns if self.df[col].dtype == 'object']
+        self.cols_list = [col for col in self.df.columns if self.df[col].dtype == 'object' or self.df[col].dtype == 'category']
 
     def set_data(self, col_name):
-        self.serie = self.df[col_name].fillna('')
+        self.serie = self.get_column(col_name)
+        # missing values are counted before they are filled with ''
+        self.set_missing()
+        if self.serie.dtype == 'category':
+            # categories of an optimized Dataset cannot take the '' fill value
+            self.serie = self.serie.astype(object)
+        self.serie = self.serie.fillna('')
         self.convert_serie_to_text()
+        self.set_counts(col_name)
+        # statistics computed once per column and kept by the profiler
+        stats = self.profiler.text(col_name) if self.use_profiler() else None
+        if stats is not None:
+            for name, value in stats.items():
+                setattr(self, name, value)
+            self.set_barchart()
+            self.set_frequent()
+            return
         self.set_unique()
-        self.set_missing()
-        self.set_empty()
         self.set_mode()
-        self.set_whitespace()
-        self.set_lowercase()
-        self.set_uppercase()
-        self.set_alphabet()
-        self.set_digit()
+        self.set_char_classes()
         self.set_barchart()
         self.set_frequent()
 
+    def get_column(self, col_name):
+        # only the selected column is read when the full DataFrame is not in memory
+        if self.dataset is not None:
+            return self.dataset.read_columns([col_name])[col_name]
+        return self.df[col_name]
+
     def convert_serie_to_text(self):
         self.serie = self.serie.astype(str)
 
     def is_serie_none(self):
         return self.serie is None or self.serie.empty
 
+    def use_profiler(self):
+        # the profiler's counts are exact and the streaming profile's are heavy hitters estimates, each is used in the matching mode
+        return self.profiler is not None and self.heavy_hitters == getattr(self.profiler, 'approximate', False)
+
+    def set_counts(self, col_name=None):
+        # one frequency computation shared by the unique count, mode, bar chart and frequent table
+        counts = self.profiler.text_counts(col_name) if self.use_profiler() and col_name is not None else None
+        if counts is not None:
+            self.value_counts = counts
+            self.max_error = 0
+        elif self.heavy_hitters:
+            # the number of unique values is estimated in the same pass, with a fixed-size HyperLogLog instead of a hash table of all the values
+            summary = MisraGries()
+            self.distinct = HyperLogLog()
+            for start in range(0, len(self.serie), CHUNK_SIZE):
+                chunk = self.serie.iloc[start:start + CHUNK_SIZE]
+                summary.update(chunk)
+                self.distinct.update(chunk.to_numpy(dtype=object))
+            self.value_counts = summary.top()
+            self.max_error = summary.max_error
+        else:
+            self.value_counts = self.serie.value_counts()
+            self.max_error = 0
+
     def set_unique(self):
-        self.n_unique = self.serie.nunique()
+        self.n_unique = self.distinct.estimate() if self.heavy_hitters else len(self.value_counts)
 
     def set_missing(self):
         self.n_missing = self.serie.isna().sum()
 
-    def set_empty(self):
-        self.n_empty = (self.serie == '').sum()
-
     def set_mode(self):
-        self.n_mode = self.serie.mode()[0] if not self.serie.mode().empty else None
-
-    def set_whitespace(self):
-        self.n_space = self.serie.str.isspace().sum()
-
-    def set_lowercase(self):
-        self.n_lower = self.serie.str.islower().sum()
-
-    def set_uppercase(self):
-        self.n_upper = self.serie.str.isupper().sum()
-
-    def set_alphabet(self):
-        self.n_alpha = self.serie.str.isalpha().sum()
+        if self.value_counts.empty:
+            self.n_mode = None
+        else:
+            # same value as pd.Series.mode(): the smallest of the most frequent values
+            self.n_mode = self.value_counts.index[self.value_counts == self.value_counts.iloc[0]].min()
 
-    def set_digit(self):
-        self.n_digit = self.serie.str.isdigit().sum()
+    def set_char_classes(self):
+        # empty, whitespace, lowercase, uppercase, alphabetic and digit counts and string lengths from a single pass over the values
+        for name, value in profile_text(self.serie).items():
+            setattr(self, name, value)
 
     def set_barchart(self):
-        value_counts = self.serie.value_counts().reset_index()
-        value_counts.columns = ['value', 'count']
-        self.barchart = alt.Chart(value_counts).mark_bar().encode(
-            x=alt.X('value:N', title='Value'),
-            y=alt.Y('count:Q', title='Count')
+        top = self.value_counts.head(self.top_k)
+        bars = pd.DataFrame({'value': top.index.astype(str), 'count': top.values})
+        # the values outside the top k are drawn as a single bar
+        n_other = len(self.serie) - int(top.sum())
+        if n_other > 0:
+            label = "Other" if self.heavy_hitters else f"Other ({len(self.value_counts) - len(top)} values)"
+            bars = pd.concat([bars, pd.DataFrame({'value': [label], 'count': [n_other]})], ignore_index=True)
+        self.barchart = alt.Chart(bars).mark_bar().encode(
+            x=alt.X('value:N', title='Value', sort=list(bars['value'])),
+            y=alt.Y('count:Q', title='Count'),
+            tooltip=['value:N', 'count:Q']
         )
 
     def set_frequent(self, end=20):
-        value_counts = self.serie.value_counts().head(end)
+        value_counts = self.value_counts.head(end)
         total_count = len(self.serie)
         self.frequent = pd.DataFrame({
             'value': value_counts.index,
@@ -88,8 +147,10 @@ class TextColumn:
         })
 
     def get_summary(self):
+        # the HyperLogLog estimate of heavy hitters mode is labelled with its error
+        unique_label = 'Number of Unique Values (estimate, ±1.6%)' if self.heavy_hitters else 'Number of Unique Values'
         summary = {
-            'Number of Unique Values': self.n_unique,
+            unique_label: self.n_unique,
             'Number of Rows with Missing Values': self.n_missing,
             'Number of Empty Rows': self.n_empty,
             'Number of Rows with Only Whitespaces': self.n_space,
@@ -97,6 +158,13 @@ class TextColumn:
             'Number of Rows with Only Uppercases': self.n_upper,
             'Number of Rows with Only Alphabet': self.n_alpha,
             'Number of Rows with Only Digits': self.n_digit,
-            'Mode Value': self.n_mode
+            'Mode Value': self.n_mode,
+            'Minimum Length': self.len_min,
+            'Average Length': self.len_mean,
+            'Median Length': self.len_p50,
+            '95th Percentile Length': self.len_p95,
+            'Maximum Length': self.len_max
         }
+        if self.heavy_hitters:
+            summary['Maximum Undercount of Frequent Values'] = self.max_error
         return pd.DataFrame(list(summary.items()), columns=["Description", "Value"])
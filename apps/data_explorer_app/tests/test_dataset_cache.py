@@ -0,0 +1,58 @@
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+# Set Python path to the app folder
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import tab_df.cache
+from tab_df.cache import DatasetCache
+
+
+class FakeUpload(io.BytesIO):
+    """
+    Class that stands for a Streamlit UploadedFile: an in-memory file with an upload id attribute.
+    """
+    def __init__(self, content, **upload_id):
+        super().__init__(content)
+        for name, value in upload_id.items():
+            setattr(self, name, value)
+
+
+@pytest.fixture
+def hash_calls(monkeypatch):
+    calls = []
+    content_hash = tab_df.cache.content_hash
+
+    def counting_hash(file_path):
+        calls.append(file_path)
+        return content_hash(file_path)
+
+    monkeypatch.setattr(tab_df.cache, "content_hash", counting_hash)
+    return calls
+
+
+@pytest.mark.parametrize("upload_id", [{"file_id": "a1b2"}, {"id": 7}], ids=["file_id", "id"])
+def test_upload_is_hashed_once_across_reruns(hash_calls, upload_id):
+    cache = DatasetCache()
+    keys = [cache.key_for(FakeUpload(b"a,b\n1,2\n", **upload_id)) for _ in range(3)]
+    assert len(set(keys)) == 1
+    assert len(hash_calls) == 1
+
+
+def test_file_id_takes_precedence_over_id(hash_calls):
+    cache = DatasetCache()
+    first = cache.key_for(FakeUpload(b"a\n1\n", file_id="new", id=1))
+    # same file_id: the cached key is reused even though id changed
+    second = cache.key_for(FakeUpload(b"a\n1\n", file_id="new", id=2))
+    assert first == second
+    assert len(hash_calls) == 1
+
+
+def test_upload_without_id_is_hashed_every_time(hash_calls):
+    cache = DatasetCache()
+    cache.key_for(FakeUpload(b"a\n1\n"))
+    cache.key_for(FakeUpload(b"a\n1\n"))
+    assert len(hash_calls) == 2
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Set Python path to the app folder
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tab_df.duplicates import DuplicateDetector
+
+
+def count(chunks, mode):
+    detector = DuplicateDetector(mode=mode)
+    for chunk in chunks:
+        detector.update(chunk)
+    return detector.n_duplicates
+
+
+@pytest.mark.parametrize("mode", ["exact", "approximate"])
+def test_large_integer_ids_are_not_duplicates(mode):
+    # distinct int64 IDs above 2**53 share the same float64 value
+    ids = np.array([2 ** 53, 2 ** 53 + 1, 2 ** 53 + 2], dtype=np.int64)
+    assert count([pd.DataFrame({"id": ids})], mode) == 0
+
+
+@pytest.mark.parametrize("mode", ["exact", "approximate"])
+def test_integers_match_across_int_and_float_chunks(mode):
+    # a missing value makes the second chunk of an integer column float64
+    chunks = [pd.DataFrame({"a": [1, 2, 3]}), pd.DataFrame({"a": [1.0, np.nan, 2.5]}), pd.DataFrame({"a": [np.nan, 2.5, 4.0]})]
+    assert count(chunks, mode) == 3
+
+
+@pytest.mark.parametrize("mode", ["exact", "approximate"])
+def test_missing_flag_is_not_a_duplicate_of_true(mode):
+    # a missing value makes the second chunk of a boolean column object
+    chunks = [pd.DataFrame({"flag": [True, False]}), pd.DataFrame({"flag": np.array([np.nan, True, None], dtype=object)})]
+    # True and the second missing value are duplicates, the first missing value is new
+    assert count(chunks, mode) == 2
@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Set Python path to the app folder
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import tab_df.logics
+from tab_date.logics import DateColumn
+from tab_df.artifacts import ArtifactCache
+from tab_df.logics import Dataset
+
+N_ROWS = 50_000
+
+
+@pytest.fixture
+def orders_csv(tmp_path, monkeypatch):
+    # Feather copies are written to the test folder instead of the user cache
+    monkeypatch.setattr(tab_df.logics, "artifact_cache", ArtifactCache(str(tmp_path / "artifacts")))
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2020-01-01", periods=300).strftime("%Y-%m-%d")
+    df = pd.DataFrame({"order_id": np.arange(N_ROWS), "order_date": rng.choice(dates, N_ROWS)})
+    path = tmp_path / "orders.csv"
+    df.to_csv(path, index=False)
+    return str(path), df
+
+
+def test_date_tab_reads_category_dates_of_optimized_dataset(orders_csv):
+    path, df = orders_csv
+    dataset = Dataset(path, optimize=True)
+    dataset.set_data()
+    # few distinct dates: the column is stored as category in optimized mode
+    assert isinstance(dataset.df["order_date"].dtype, pd.CategoricalDtype)
+
+    date_column = DateColumn(df=dataset.df, profiler=dataset.profiler, dataset=dataset)
+    date_column.set_data("order_date")
+
+    expected = pd.to_datetime(df["order_date"])
+    assert pd.api.types.is_datetime64_any_dtype(date_column.series)
+    assert date_column.col_min == expected.min()
+    assert date_column.col_max == expected.max()
+    assert date_column.n_unique == expected.nunique()
+    summary = date_column.get_summary().set_index("Description")["Value"]
+    assert summary["Number of Weekend Dates"] == (expected.dt.dayofweek >= 5).sum()
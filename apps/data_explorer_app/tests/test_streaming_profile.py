@@ -0,0 +1,46 @@
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Set Python path to the app folder
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tab_df.profiler import Profiler
+from tab_df.streaming import StreamingProfile
+
+
+@pytest.fixture
+def mixed_csv():
+    # 'code' holds numbers in the first chunk and text afterwards, 'shipped' holds dates under a name that does not look like one and 'update_note' holds text under a name that does
+    n_rows = 1000
+    df = pd.DataFrame({
+        'code': [str(i) for i in range(n_rows - 10)] + ['X%d' % i for i in range(10)],
+        'shipped': pd.date_range('2021-01-01', periods=n_rows, freq='h').strftime('%Y-%m-%d %H:%M'),
+        'update_note': ['late' if i % 3 else 'on time' for i in range(n_rows)],
+        'amount': [i / 4 for i in range(n_rows)],
+    })
+    return df.to_csv(index=False).encode()
+
+
+def test_kinds_come_from_every_chunk(mixed_csv):
+    profile = StreamingProfile().read_csv(io.BytesIO(mixed_csv), chunksize=100)
+    assert profile.kinds == {'code': 'text', 'shipped': 'date', 'update_note': 'text', 'amount': 'numeric'}
+    assert profile.n_rows == 1000
+
+
+def test_promoted_column_counts_every_chunk(mixed_csv):
+    streamed = StreamingProfile().read_csv(io.BytesIO(mixed_csv), chunksize=100)
+    in_memory = Profiler(pd.read_csv(io.BytesIO(mixed_csv))).run()
+    assert streamed.text('code')['n_missing'] == in_memory.text('code')['n_missing']
+    assert streamed.text('code')['n_digit'] == in_memory.text('code')['n_digit'] == 990
+    assert streamed.date('shipped', None)['n_missing'] == 0
+    assert streamed.date('shipped', None)['col_max'] == pd.Timestamp('2021-02-11 15:00')
+
+
+def test_upload_is_read_from_the_start(mixed_csv):
+    upload = io.BytesIO(mixed_csv)
+    pd.read_csv(upload)
+    assert StreamingProfile().read_csv(upload, chunksize=100).n_rows == 1000